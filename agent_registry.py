@@ -0,0 +1,218 @@
+# agent_registry.py
+
+import importlib
+import threading
+from typing import Dict, List, Optional, Union
+
+from model_utils import bind_model
+
+
+class AgentRegistryError(Exception):
+    """Raised when an agent is unknown or its module cannot be loaded."""
+    pass
+
+
+# Entry-point group third-party packages can use to ship additional agents, e.g. in pyproject.toml:
+#   [project.entry-points."injala_one.agents"]
+#   newagent = "newagent:NewAgent"
+ENTRY_POINT_GROUP = "injala_one.agents"
+
+# === Built-in Agents ===
+# Agents are referenced by "module:ClassName" and only imported on first use.
+_REGISTRY: Dict[str, Dict] = {
+    "asuretify": {
+        "target": "asuretify:AsuretifyAgent",
+        "file_count": 2,
+        "roles": ["contract", "acord_coi"],
+        "description": "Compare insurance requirements in a contract vs. a COI",
+    },
+    "kinetic": {
+        "target": "kinetic:KineticAgent",
+        "file_count": 1,
+        "roles": ["safety_manual"],
+        "description": "Evaluate subcontractor safety or OSHA policies",
+    },
+    "wrappotal": {
+        "target": "wrappotal:WrappotalAgent",
+        "file_count": 1,
+        "roles": ["wrapup"],
+        "description": "Analyze wrap-up (OCIP/CCIP) insurance documents",
+    },
+    "riskguru": {
+        "target": "riskguru:RiskguruAgent",
+        "file_count": 1,
+        "roles": ["financials"],
+        "description": "Rate subcontractor risk from company profile or documents",
+    },
+    "prequaligy": {
+        "target": "prequaligy:PrequaligyAgent",
+        "file_count": 1,
+        "roles": ["financials"],
+        "description": "Assess financial prequalification, financials, bonding, etc.",
+    },
+    "anzenn": {
+        "target": "anzenn:AnzennAgent",
+        "file_count": 1,
+        "roles": ["safety_manual"],
+        "description": "Evaluate workplace safety, field safety protocols, or audits",
+    },
+}
+
+# Reentrant: entry points are registered (via register_agent) while the loader holds the lock
+_lock = threading.RLock()
+_entry_points_loaded = False
+
+
+def register_agent(
+    name: str,
+    target: Union[str, type, None] = None,
+    file_count: int = 1,
+    description: str = "",
+    roles: Optional[List[str]] = None,
+):
+    """
+    Registers an agent under the given name.
+
+    Can be called directly with a "module:ClassName" string (imported lazily on first use)
+    or a class, or used as a class decorator:
+
+        @register_agent("newagent", file_count=1, description="Review ...")
+        class NewAgent:
+            ...
+
+    Args:
+        name (str): Agent key used by the router (lowercase).
+        target (str | type, optional): "module:ClassName" path or the agent class itself.
+        file_count (int): Number of PDF files the agent's `run()` expects.
+        description (str): One-line summary shown to the routing model.
+        roles (List[str], optional): Document role expected for each file argument, in order
+            (see `auto_router.DOCUMENT_ROLES`), used to assign uploads deterministically.
+
+    Returns:
+        The decorator when `target` is omitted, otherwise None.
+    """
+    def _register(agent_target):
+        if isinstance(agent_target, str) and ":" not in agent_target:
+            raise AgentRegistryError(f"Agent target must look like 'module:ClassName', got: {agent_target}")
+        with _lock:
+            _REGISTRY[name.lower()] = {
+                "target": agent_target,
+                "file_count": file_count,
+                "description": description,
+                "roles": roles,
+            }
+        return agent_target
+
+    if target is None:
+        return _register
+    _register(target)
+
+
+def _load_entry_points() -> None:
+    """Registers agents advertised by installed packages. Runs at most once per process."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+
+    with _lock:
+        if _entry_points_loaded:
+            return
+
+        try:
+            from importlib.metadata import entry_points
+
+            try:
+                eps = entry_points(group=ENTRY_POINT_GROUP)
+            except TypeError:  # Python < 3.10
+                eps = entry_points().get(ENTRY_POINT_GROUP, [])
+        except Exception as e:
+            print(f"[WARN] Failed to read agent entry points: {e}")
+            eps = []
+
+        for ep in eps:
+            if ep.name.lower() not in _REGISTRY:
+                register_agent(ep.name, ep.value)
+
+        # Only set once every entry point is registered, so other threads never skip loading early
+        _entry_points_loaded = True
+
+
+def list_agents() -> List[str]:
+    """Returns the names of all registered agents without importing them."""
+    _load_entry_points()
+    return list(_REGISTRY)
+
+
+def is_registered(name: str) -> bool:
+    """Checks whether an agent name is registered without importing it."""
+    if name in _REGISTRY:
+        return True
+    _load_entry_points()
+    return name in _REGISTRY
+
+
+def get_file_count(name: str) -> int:
+    """Returns the number of files the agent expects, without importing it."""
+    return _get_entry(name)["file_count"]
+
+
+def get_description(name: str) -> str:
+    """Returns the agent's routing description, without importing it."""
+    return _get_entry(name).get("description") or name
+
+
+def get_file_roles(name: str) -> Optional[List[str]]:
+    """Returns the document role expected for each of the agent's files, if declared."""
+    return _get_entry(name).get("roles")
+
+
+def _get_entry(name: str) -> Dict:
+    if not is_registered(name):
+        raise AgentRegistryError(f"No agent registered under: `{name}`")
+    return _REGISTRY[name]
+
+
+def get_agent_class(name: str) -> type:
+    """
+    Returns the agent class, importing its module on first use.
+
+    Args:
+        name (str): Registered agent name.
+
+    Returns:
+        type: The agent class.
+
+    Raises:
+        AgentRegistryError: If the agent is unknown or cannot be imported.
+    """
+    entry = _get_entry(name)
+    target = entry["target"]
+    if not isinstance(target, str):
+        return target
+
+    module_name, class_name = target.split(":", 1)
+    try:
+        agent_class = getattr(importlib.import_module(module_name), class_name)
+    except Exception as e:
+        raise AgentRegistryError(f"Failed to load agent `{name}` from `{target}`: {e}") from e
+
+    # Cache the resolved class so later lookups skip the import machinery
+    with _lock:
+        entry["target"] = agent_class
+    return agent_class
+
+
+def create_agent(name: str, model, **kwargs):
+    """
+    Instantiates a registered agent with the given model.
+
+    Args:
+        name (str): Registered agent name.
+        model: Gemini-compatible model passed to the agent constructor. A `ModelCascade`
+            is bound to the agent's escalation policy first.
+
+    Returns:
+        An agent instance exposing `.run(*file_bytes)`.
+    """
+    return get_agent_class(name)(bind_model(model, name), **kwargs)
+
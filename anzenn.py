@@ -1,6 +1,7 @@
 # anzenn.py
 
 from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
 
 
 class AnzennAgent:
@@ -9,6 +10,7 @@ class AnzennAgent:
     """
     def __init__(self, gemini_model):
         self.model = gemini_model
+        self.document_texts = {}
 
     def run(self, file_bytes: bytes) -> str:
         """
@@ -32,16 +34,36 @@ class AnzennAgent:
             if not extracted_text.strip():
                 return "Text extraction failed or resulted in empty content."
 
-            # Step 3: Build prompt
-            prompt = self._build_prompt(extracted_text)
-
-            # Step 4: Query Gemini model
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(extracted_text)
 
         except Exception as e:
             return f"An error occurred while processing the document: {e}"
 
+    def analyze(self, extracted_text: str) -> str:
+        """
+        Evaluates already-extracted safety documentation against OSHA guidelines.
+
+        Args:
+            extracted_text (str): OCR-extracted document text.
+
+        Returns:
+            str: AI-generated compliance analysis and risk report.
+        """
+        self.document_texts = {"Document": extracted_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("anzenn", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Build prompt
+        prompt = screen.annotate_prompt(self._build_prompt(extracted_text))
+
+        # Step 3: Query Gemini model
+        response = self.model.generate_content(prompt)
+        return response.text.strip()
+
     def _build_prompt(self, extracted_text: str) -> str:
         """
         Constructs a structured prompt for Gemini to analyze safety & compliance documentation.
@@ -0,0 +1,478 @@
+# api_server.py
+
+"""
+Async HTTP API exposing agent routing, every registered agent and job status.
+
+Run with:
+    GEMINI_API_KEY=... python api_server.py --port 8080
+    python api_server.py --fake-model     # canned responses, no Gemini calls
+
+Endpoints:
+    GET  /health              Liveness check
+    GET  /metrics             Request, job, OCR, LLM, token-reduction and model-cascade counters
+    GET  /agents              Registered agents and their expected file counts
+    POST /route               multipart: `query` + `files` -> {"agent", "files", "roles", "runs", "unassigned"}
+    POST /agents/{name}       multipart: `files` (in the agent's argument order); `?async=1` returns a job id
+    POST /agents/asuretify/bulk  multipart: contract then COIs; streams one NDJSON row per COI
+    GET  /jobs/{job_id}       Job status and result
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+import agent_registry
+from auto_router import assign_files, detect_agent_with_gemini, fingerprint_files, unassigned_files
+from model_utils import ModelCascade
+from ocr_utils import extract_normalized_text_from_pdf
+from text_normalizer import get_normalization_stats
+
+
+def _json_error(error_cls, message: str, **extra):
+    """Builds an aiohttp HTTP exception with a JSON body."""
+    body = {"error": message}
+    body.update(extra)
+    return error_cls(text=json.dumps(body), content_type="application/json")
+
+
+class FakeModel:
+    """
+    Stand-in for a Gemini model that returns canned text, for local testing of the service
+    without network access or an API key.
+    """
+
+    class _Response:
+        def __init__(self, text: str):
+            self.text = text
+
+    def __init__(self, text: str = "agent: kinetic\nfiles: [0]\n✅ Final Verdict: COMPLIANT", delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self._Response(self.text)
+
+
+class ServiceMetrics:
+    """In-process counters exposed on /metrics."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.ocr_count = 0
+        self.ocr_seconds = 0.0
+        self.llm_count = 0
+        self.llm_seconds = 0.0
+        self.llm_in_flight = 0
+
+    def snapshot(self, jobs: Dict[str, Dict], llm_limit: int) -> Dict:
+        job_counts: Dict[str, int] = {}
+        for job in jobs.values():
+            job_counts[job["status"]] = job_counts.get(job["status"], 0) + 1
+
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "jobs": job_counts,
+            "ocr": {
+                "count": self.ocr_count,
+                "avg_ms": round(1000 * self.ocr_seconds / self.ocr_count, 1) if self.ocr_count else 0.0,
+            },
+            "llm": {
+                "count": self.llm_count,
+                "avg_ms": round(1000 * self.llm_seconds / self.llm_count, 1) if self.llm_count else 0.0,
+                "in_flight": self.llm_in_flight,
+                "limit": llm_limit,
+            },
+        }
+
+
+class AgentService:
+    """
+    Holds the shared model, worker pools, concurrency limits and job table for the HTTP API.
+    """
+
+    def __init__(
+        self,
+        model,
+        ocr_workers: int = 2,
+        llm_concurrency: int = 8,
+        request_timeout: float = 300.0,
+        max_upload_mb: float = 50.0,
+        max_jobs: int = 1000,
+        max_pending_jobs: int = 100,
+        ocr_executor: Optional[Executor] = None,
+    ):
+        """
+        Args:
+            model: Gemini-compatible model with a `.generate_content(prompt)` method.
+            ocr_workers (int): Size of the process pool used for CPU-bound OCR.
+            llm_concurrency (int): Maximum number of concurrent model calls.
+            request_timeout (float): Seconds a synchronous request waits before returning 504.
+            max_upload_mb (float): Maximum size of a single uploaded file.
+            max_jobs (int): Number of finished jobs kept for status lookups.
+            max_pending_jobs (int): Queued/running agent jobs above which new runs get 503.
+            ocr_executor (Executor, optional): Executor for OCR and fingerprinting (default: a
+                process pool of `ocr_workers`); tests pass a thread pool. A passed-in executor is
+                not shut down by the service.
+        """
+        self.model = model
+        self.llm_limit = llm_concurrency
+        self.request_timeout = request_timeout
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.max_jobs = max_jobs
+        self.max_pending_jobs = max_pending_jobs
+
+        # "spawn" keeps OCR workers independent of the event loop's process state
+        self._owns_ocr_pool = ocr_executor is None
+        self.ocr_pool = ocr_executor or ProcessPoolExecutor(
+            max_workers=ocr_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+        self.llm_semaphore: Optional[asyncio.Semaphore] = None
+
+        self.metrics = ServiceMetrics()
+        self.jobs: Dict[str, Dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def startup(self, app: web.Application) -> None:
+        # Created inside the running loop
+        self.llm_semaphore = asyncio.Semaphore(self.llm_limit)
+
+    async def cleanup(self, app: web.Application) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        if self._owns_ocr_pool:
+            self.ocr_pool.shutdown(wait=False)
+        self.llm_pool.shutdown(wait=False)
+
+    # === Execution helpers ===
+
+    async def _ocr(self, file_bytes: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            normalized = await loop.run_in_executor(self.ocr_pool, extract_normalized_text_from_pdf, file_bytes)
+            # OCR runs in worker processes, so their token savings are recorded here
+            get_normalization_stats().record(normalized)
+            return normalized.text
+        finally:
+            self.metrics.ocr_count += 1
+            self.metrics.ocr_seconds += time.perf_counter() - start
+
+    async def _call_llm(self, func, *args):
+        """Runs a blocking function that makes one model call, bounded by the LLM semaphore."""
+        loop = asyncio.get_running_loop()
+        async with self.llm_semaphore:
+            self.metrics.llm_in_flight += 1
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self.llm_pool, func, *args)
+            finally:
+                self.metrics.llm_in_flight -= 1
+                self.metrics.llm_count += 1
+                self.metrics.llm_seconds += time.perf_counter() - start
+
+    async def _run_agent(self, job: Dict, files: List[bytes]) -> None:
+        job["status"] = "running"
+        try:
+            texts = await asyncio.gather(*(self._ocr(data) for data in files))
+            agent = agent_registry.create_agent(job["agent"], self.model)
+            job["result"] = await self._call_llm(agent.analyze, *texts)
+            job["status"] = "done"
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            self.metrics.errors += 1
+        finally:
+            job["finished_at"] = time.time()
+            self._tasks.pop(job["id"], None)
+            self._prune_jobs()
+
+    def _prune_jobs(self) -> None:
+        finished = [j for j in self.jobs.values() if j["status"] not in ("queued", "running")]
+        excess = len(self.jobs) - self.max_jobs
+        for job in sorted(finished, key=lambda j: j["finished_at"])[:max(excess, 0)]:
+            self.jobs.pop(job["id"], None)
+
+    async def _read_upload(self, request: web.Request) -> Tuple[Dict[str, str], List[bytes]]:
+        """
+        Streams a multipart upload, enforcing the per-file size limit while reading.
+
+        Returns:
+            Tuple[Dict[str, str], List[bytes]]: Text fields and file contents in upload order.
+        """
+        if not request.content_type.startswith("multipart/"):
+            raise _json_error(web.HTTPBadRequest, "Expected a multipart/form-data upload.")
+
+        fields: Dict[str, str] = {}
+        files: List[bytes] = []
+        reader = await request.multipart()
+
+        async for part in reader:
+            if part.filename is None:
+                fields[part.name] = (await part.text()).strip()
+                continue
+
+            data = bytearray()
+            while True:
+                chunk = await part.read_chunk()
+                if not chunk:
+                    break
+                data.extend(chunk)
+                if len(data) > self.max_upload_bytes:
+                    raise _json_error(
+                        web.HTTPRequestEntityTooLarge,
+                        f"File `{part.filename}` exceeds {self.max_upload_bytes // (1024 * 1024)} MB.",
+                    )
+            files.append(bytes(data))
+
+        return fields, files
+
+    # === Handlers ===
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def get_metrics(self, request: web.Request) -> web.Response:
+        snapshot = self.metrics.snapshot(self.jobs, self.llm_limit)
+        snapshot["ocr_normalization"] = get_normalization_stats().snapshot()
+        if isinstance(self.model, ModelCascade):
+            snapshot["model_cascade"] = self.model.stats.snapshot()
+        return web.json_response(snapshot)
+
+    async def list_agents(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            name: {
+                "file_count": agent_registry.get_file_count(name),
+                "description": agent_registry.get_description(name),
+            }
+            for name in agent_registry.list_agents()
+        })
+
+    async def route(self, request: web.Request) -> web.Response:
+        fields, files = await self._read_upload(request)
+        query = fields.get("query")
+        if not query or not files:
+            raise _json_error(web.HTTPBadRequest, "Both a `query` field and at least one file are required.")
+
+        async def _route() -> Tuple[List[str], str, List[int]]:
+            loop = asyncio.get_running_loop()
+            roles = await loop.run_in_executor(self.ocr_pool, fingerprint_files, files)
+            agent, file_idxs = await self._call_llm(detect_agent_with_gemini, self.model, query, files, roles)
+            return roles, agent, file_idxs
+
+        try:
+            # First-page OCR of a large upload counts against the request timeout too
+            roles, agent, file_idxs = await asyncio.wait_for(_route(), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise _json_error(web.HTTPGatewayTimeout, "Routing timed out.")
+        except Exception as e:
+            raise _json_error(web.HTTPUnprocessableEntity, str(e))
+
+        runs = assign_files(agent, roles) or [file_idxs]
+        return web.json_response({
+            "agent": agent,
+            "files": file_idxs,
+            "roles": roles,
+            "runs": runs,
+            "unassigned": unassigned_files(runs, len(files)),
+        })
+
+    async def run_agent(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"].lower()
+        if not agent_registry.is_registered(name):
+            raise _json_error(web.HTTPNotFound, f"No agent registered under: `{name}`")
+
+        _, files = await self._read_upload(request)
+        required_files = agent_registry.get_file_count(name)
+        if len(files) != required_files:
+            raise _json_error(
+                web.HTTPBadRequest,
+                f"Agent `{name}` needs {required_files} file(s), but got {len(files)}.",
+            )
+
+        if len(self._tasks) >= self.max_pending_jobs:
+            self.metrics.rejected += 1
+            raise _json_error(
+                web.HTTPServiceUnavailable,
+                f"Too many pending jobs ({len(self._tasks)}); retry later.",
+            )
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "agent": name,
+            "status": "queued",
+            "created_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        task = asyncio.create_task(self._run_agent(job, files))
+        self._tasks[job_id] = task
+
+        if request.query.get("async", "").lower() in ("1", "true", "yes"):
+            return web.json_response({"job_id": job_id, "status": job["status"]}, status=202)
+
+        try:
+            # Shielded so that a timed-out request leaves the job running for /jobs polling
+            await asyncio.wait_for(asyncio.shield(task), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise _json_error(web.HTTPGatewayTimeout, "Agent run timed out; poll the job for the result.", job_id=job_id)
+
+        status = 200 if job["status"] == "done" else 500
+        return web.json_response(job, status=status)
+
+    async def run_asuretify_bulk(self, request: web.Request) -> web.StreamResponse:
+        """
+        Checks many COIs against one contract and streams one NDJSON row per COI as it completes.
+        The first uploaded file is the contract; every following file is a COI.
+        """
+        _, files = await self._read_upload(request)
+        if len(files) < 2:
+            raise _json_error(web.HTTPBadRequest, "Upload the contract first, followed by at least one COI.")
+
+        agent = agent_registry.create_agent("asuretify", self.model)
+        try:
+            contract_text = await asyncio.wait_for(self._ocr(files[0]), self.request_timeout)
+            requirements = await asyncio.wait_for(
+                self._call_llm(agent.extract_requirements, contract_text), self.request_timeout
+            )
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise _json_error(web.HTTPGatewayTimeout, "Contract requirement extraction timed out.")
+        except Exception as e:
+            raise _json_error(web.HTTPUnprocessableEntity, f"Failed to process the contract: {e}")
+
+        async def _check(idx: int, coi_bytes: bytes) -> Dict:
+            row = {"index": idx, "error": None}
+            try:
+                coi_text = await self._ocr(coi_bytes)
+                result = await asyncio.wait_for(
+                    self._call_llm(agent.check_coi, requirements, coi_text), self.request_timeout
+                )
+                row.update(result)
+            except Exception as e:
+                row.update({"verdict": "ERROR", "risk_score": None, "gaps": "", "source": None,
+                            "error": str(e) or type(e).__name__})
+            return row
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        await response.write((json.dumps({"requirements": requirements}) + "\n").encode())
+
+        for next_row in asyncio.as_completed([_check(idx, data) for idx, data in enumerate(files[1:])]):
+            await response.write((json.dumps(await next_row) + "\n").encode())
+
+        await response.write_eof()
+        return response
+
+    async def job_status(self, request: web.Request) -> web.Response:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise _json_error(web.HTTPNotFound, "Unknown job id.")
+        return web.json_response(job)
+
+
+SERVICE_KEY = web.AppKey("service", AgentService)
+
+
+@web.middleware
+async def _count_requests(request: web.Request, handler):
+    service: AgentService = request.app[SERVICE_KEY]
+    route = request.match_info.route.resource
+    key = f"{request.method} {route.canonical if route is not None else request.path}"
+    service.metrics.requests[key] = service.metrics.requests.get(key, 0) + 1
+    try:
+        return await handler(request)
+    except web.HTTPException as e:
+        if e.status >= 500:
+            service.metrics.errors += 1
+        raise
+
+
+def create_app(model, **service_options) -> web.Application:
+    """
+    Builds the aiohttp application.
+
+    Args:
+        model: Gemini-compatible model or `ModelCascade` (or `FakeModel` for tests).
+        **service_options: Forwarded to `AgentService` (ocr_workers, llm_concurrency, ...).
+
+    Returns:
+        web.Application: Configured application.
+    """
+    service = AgentService(model, **service_options)
+    app = web.Application(middlewares=[_count_requests])
+    app[SERVICE_KEY] = service
+    app.on_startup.append(service.startup)
+    app.on_cleanup.append(service.cleanup)
+
+    app.router.add_get("/health", service.health)
+    app.router.add_get("/metrics", service.get_metrics)
+    app.router.add_get("/agents", service.list_agents)
+    app.router.add_post("/route", service.route)
+    app.router.add_post("/agents/asuretify/bulk", service.run_asuretify_bulk)
+    app.router.add_post("/agents/{name}", service.run_agent)
+    app.router.add_get("/jobs/{job_id}", service.job_status)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Injala One AI Suite HTTP API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ocr-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--request-timeout", type=float, default=300.0)
+    parser.add_argument("--max-upload-mb", type=float, default=50.0)
+    parser.add_argument("--max-pending-jobs", type=int, default=100)
+    parser.add_argument("--fake-model", action="store_true", help="Serve canned responses instead of calling Gemini.")
+    args = parser.parse_args()
+
+    if args.fake_model:
+        model = FakeModel()
+    else:
+        from model_utils import load_model_cascade
+
+        model = load_model_cascade(os.environ.get("GEMINI_API_KEY", ""))
+
+    app = create_app(
+        model,
+        ocr_workers=args.ocr_workers,
+        llm_concurrency=args.llm_concurrency,
+        request_timeout=args.request_timeout,
+        max_upload_mb=args.max_upload_mb,
+        max_pending_jobs=args.max_pending_jobs,
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,21 @@
 # app.py
 
 import streamlit as st
-from model_utils import load_gemini
-from auto_router import detect_agent_with_gemini
-
-# === Import all agents ===
-from asuretify import AsuretifyAgent
-from kinetic import KineticAgent
-from wrappotal import WrappotalAgent
-from riskguru import RiskguruAgent
-from prequaligy import PrequaligyAgent
-from anzenn import AnzennAgent
-
-# === Agent Registry ===
-AGENTS = {
-    "asuretify": {"class": AsuretifyAgent, "file_count": 2},
-    "kinetic": {"class": KineticAgent, "file_count": 1},
-    "wrappotal": {"class": WrappotalAgent, "file_count": 1},
-    "riskguru": {"class": RiskguruAgent, "file_count": 1},
-    "prequaligy": {"class": PrequaligyAgent, "file_count": 1},
-    "anzenn": {"class": AnzennAgent, "file_count": 1},
-}
+from model_utils import bind_model, load_model_cascade
+from text_normalizer import get_normalization_stats
+from auto_router import plan_agent_runs, unassigned_files
+from followup import FollowUpSession, FollowUpError
+import agent_registry
+
+# Agents are resolved through the lazy registry in agent_registry.py and only imported
+# once the router selects them.
 
 # === UI Layout ===
 st.set_page_config(page_title="Injala One AI Suite", layout="centered")
 st.title("🤖 Injala One AI Agent Suite")
 st.markdown(
-    "Upload 1–2 PDFs and ask a question. The system will auto-select the best AI agent "
-    "to analyze your documents and return a structured report."
+    "Upload one or more PDFs and ask a question. The system will auto-select the best AI agent, "
+    "match each file to its role (e.g. contract vs. COI) and return a structured report."
 )
 
 # === Ask for Gemini API Key explicitly ===
@@ -42,8 +30,14 @@ if not api_key:
     st.stop()
 
 # === Load LLM Model ===
+@st.cache_resource(show_spinner=False)
+def get_model(key: str):
+    # Cached so the cascade (and its escalation/latency stats) survives Streamlit reruns
+    return load_model_cascade(key)
+
+
 try:
-    model = load_gemini(api_key)
+    model = get_model(api_key)
 except Exception as e:
     st.error(f"❌ Failed to initialize Gemini model:\n\n{e}")
     st.stop()
@@ -61,43 +55,131 @@ files = st.file_uploader(
 
 # === Execution Trigger ===
 if query and files:
-    with st.spinner("🔍 Analyzing input and selecting the best agent..."):
-        try:
-            # Auto-detect agent and file mapping
-            agent_key, file_idxs = detect_agent_with_gemini(model, query, files)
-
-            if agent_key not in AGENTS:
-                st.error(f"❌ No matching agent found for: `{agent_key}`")
+    # Streamlit reruns the whole script on every interaction, so the agent run is keyed on
+    # the query and uploads and only repeated when one of them changes.
+    run_key = (query, tuple((f.name, f.size) for f in files))
+
+    if st.session_state.get("run_key") != run_key:
+        previous_session = st.session_state.pop("followup_session", None)
+        if previous_session is not None:
+            previous_session.close()
+        st.session_state.pop("result", None)
+        st.session_state["followup_log"] = []
+
+        with st.spinner("🔍 Analyzing input and selecting the best agent..."):
+            try:
+                # Auto-detect agent and assign files to runs from their detected roles
+                agent_key, runs = plan_agent_runs(model, query, files)
+
+                if not agent_registry.is_registered(agent_key):
+                    st.error(f"❌ No matching agent found for: `{agent_key}`")
+                    st.stop()
+
+                required_files = agent_registry.get_file_count(agent_key)
+                runs = [file_idxs for file_idxs in runs if len(file_idxs) == required_files]
+
+                if not runs:
+                    st.error(f"❌ Agent `{agent_key}` needs {required_files} file(s) of the right type.")
+                    st.stop()
+
+                outputs = []
+                if agent_key == "asuretify" and len(runs) > 1:
+                    # Bulk mode: one contract vs. many COIs, contract requirements extracted once
+                    from asuretify import format_compliance_table
+
+                    contract_idx = runs[0][0]
+                    coi_idxs = [file_idxs[1] for file_idxs in runs]
+                    coi_names = [files[i].name for i in coi_idxs]
+
+                    agent = agent_registry.create_agent(agent_key, model)
+                    table = st.empty()
+                    rows = []
+                    coi_bytes = [files[i].getvalue() for i in coi_idxs]
+                    for row in agent.run_bulk(files[contract_idx].getvalue(), coi_bytes, coi_names=coi_names):
+                        rows.append(row)
+                        table.markdown(format_compliance_table(rows, coi_names))
+                    outputs.append(([contract_idx] + coi_idxs, format_compliance_table(rows, coi_names)))
+                else:
+                    for file_idxs in runs:
+                        # Read files
+                        file_bytes = [files[i].getvalue() for i in file_idxs]
+
+                        # Run agent
+                        agent = agent_registry.create_agent(agent_key, model)
+                        outputs.append((file_idxs, agent.run(*file_bytes)))
+
+                if len(outputs) == 1:
+                    result = outputs[0][1]
+                else:
+                    result = "\n\n".join(
+                        f"=== {' vs '.join(files[i].name for i in file_idxs)} ===\n{output}"
+                        for file_idxs, output in outputs
+                    )
+
+                st.session_state["run_key"] = run_key
+                st.session_state["result"] = result
+                st.session_state["skipped_files"] = [files[i].name for i in unassigned_files(runs, len(files))]
+
+                # Keep the extracted text and first response for follow-up questions
+                if len(outputs) == 1 and agent.document_texts:
+                    st.session_state["followup_session"] = FollowUpSession(
+                        bind_model(model, "followup"), agent_key, agent.document_texts, result
+                    )
+
+            except Exception as e:
+                st.error("⚠️ Error occurred during processing:")
+                st.exception(e)
                 st.stop()
 
-            agent_info = AGENTS[agent_key]
-            required_files = agent_info["file_count"]
-
-            if len(file_idxs) != required_files:
-                st.error(f"❌ Agent `{agent_key}` needs {required_files} file(s), but got {len(file_idxs)}.")
-                st.stop()
-
-            # Read files
-            file_bytes = [files[i].read() for i in file_idxs]
-
-            # Run agent
-            agent = agent_info["class"](model)
-            result = agent.run(*file_bytes)
-
-            # Output result
-            st.subheader("📋 Agent Response")
-            st.text_area("📄 Output", result, height=400)
-
-            # Optional download button for structured output
-            st.download_button(
-                "📥 Download Result",
-                result.encode(),
-                "agent_output.txt",
-                "text/plain"
+    result = st.session_state["result"]
+
+    skipped_files = st.session_state.get("skipped_files")
+    if skipped_files:
+        st.warning(
+            f"⚠️ {len(skipped_files)} file(s) did not match a role for the selected agent and were not processed: "
+            + ", ".join(skipped_files)
+        )
+
+    # Output result
+    st.subheader("📋 Agent Response")
+    st.text_area("📄 Output", result, height=400)
+
+    # Optional download button for structured output
+    st.download_button(
+        "📥 Download Result",
+        result.encode(),
+        "agent_output.txt",
+        "text/plain"
+    )
+
+    with st.expander("📊 Model usage"):
+        st.json(model.stats.snapshot())
+
+    with st.expander("📉 OCR token reduction"):
+        st.json(get_normalization_stats().snapshot())
+
+    # === Follow-up Q&A ===
+    session = st.session_state.get("followup_session")
+    if session is not None:
+        st.subheader("💬 Follow-up Questions")
+        for question, answer in st.session_state["followup_log"]:
+            st.markdown(f"**Q:** {question}")
+            st.markdown(answer)
+
+        with st.form("followup_form", clear_on_submit=True):
+            followup = st.text_input(
+                "Ask about the same documents",
+                placeholder="e.g., What were the umbrella limits?"
             )
-
-        except Exception as e:
-            st.error("⚠️ Error occurred during processing:")
-            st.exception(e)
+            submitted = st.form_submit_button("Ask")
+
+        if submitted and followup:
+            with st.spinner("💬 Answering from the processed documents..."):
+                try:
+                    answer = session.ask(followup)
+                    st.session_state["followup_log"].append((followup, answer))
+                    st.rerun()
+                except FollowUpError as e:
+                    st.error(f"⚠️ {e}")
 else:
-    st.info("💡 Please enter a query and upload 1–2 PDFs to begin.")
+    st.info("💡 Please enter a query and upload one or more PDFs to begin.")
@@ -1,6 +1,16 @@
 # asuretify.py
 
-from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from model_utils import bind_model
+from ocr_utils import extract_images_from_pdf, extract_text_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
+
+_VERDICT_RE = re.compile(r"final verdict\W*(non-compliant|compliant)", re.IGNORECASE)
+_RISK_SCORE_RE = re.compile(r"risk score(?:\s*\(1\s*-\s*5\))?[^0-9\n]*([1-5])", re.IGNORECASE)
+_GAPS_RE = re.compile(r"gaps\W*:\s*(.+)", re.IGNORECASE)
 
 
 class AsuretifyAgent:
@@ -11,6 +21,7 @@ class AsuretifyAgent:
 
     def __init__(self, model):
         self.model = model
+        self.document_texts = {}
 
     def run(self, contract_bytes: bytes, coi_bytes: bytes) -> str:
         """
@@ -36,18 +47,141 @@ class AsuretifyAgent:
             if not coi_text.strip():
                 return "No readable text extracted from the COI document."
 
-            # Step 3: Generate LLM prompt
-            prompt = self._build_prompt(contract_text, coi_text)
-
-            # Step 4: Analyze with the model
-            response = self.model.generate_content(prompt)
-
-            # Step 5: Return formatted result
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(contract_text, coi_text)
 
         except Exception as e:
             return f"❌ An error occurred during COI validation: {str(e)}"
 
+    def analyze(self, contract_text: str, coi_text: str) -> str:
+        """
+        Compares already-extracted contract and COI text for compliance.
+
+        Args:
+            contract_text (str): OCR-extracted contract text.
+            coi_text (str): OCR-extracted COI text.
+
+        Returns:
+            str: A structured compliance audit report.
+        """
+        self.document_texts = {"Contract": contract_text, "Certificate of Insurance": coi_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("asuretify", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Generate LLM prompt
+        prompt = screen.annotate_prompt(self._build_prompt(contract_text, coi_text))
+
+        # Step 3: Analyze with the model
+        response = self.model.generate_content(prompt)
+
+        # Step 4: Return formatted result
+        return response.text.strip()
+
+    def extract_requirements(self, contract_text: str) -> str:
+        """
+        Condenses a contract into a compact, reusable set of COI insurance requirements.
+
+        Args:
+            contract_text (str): OCR-extracted contract text.
+
+        Returns:
+            str: One requirement per line (coverages and limits, AI, waiver, P&NC, holder).
+        """
+        model = bind_model(self.model, "asuretify_requirements")
+        response = model.generate_content(self._build_requirements_prompt(contract_text))
+        return response.text.strip()
+
+    def check_coi(self, requirements: str, coi_text: str) -> Dict:
+        """
+        Checks one COI against a pre-extracted requirement set.
+
+        Args:
+            requirements (str): Output of `extract_requirements()`.
+            coi_text (str): OCR-extracted COI text.
+
+        Returns:
+            Dict: "verdict", "risk_score", "gaps" and "source" ("rules" or "llm").
+        """
+        # Only COI rules run here: the requirement set always has a line per requirement (including
+        # "Not required" ones), so contract-conditional rules are left to the model
+        screen = get_rule_engine().evaluate("asuretify", {"Certificate of Insurance": coi_text})
+        if screen.is_decisive:
+            return {
+                "verdict": screen.verdict,
+                "risk_score": screen.risk_score,
+                "gaps": "; ".join(o["fact"] for o in screen.triggered),
+                "source": "rules",
+            }
+
+        prompt = screen.annotate_prompt(self._build_bulk_prompt(requirements, coi_text))
+        text = self.model.generate_content(prompt).text.strip()
+
+        verdict = _VERDICT_RE.search(text)
+        risk_score = _RISK_SCORE_RE.search(text)
+        gaps = _GAPS_RE.search(text)
+        return {
+            "verdict": verdict.group(1).upper() if verdict else "UNKNOWN",
+            "risk_score": int(risk_score.group(1)) if risk_score else None,
+            "gaps": gaps.group(1).strip() if gaps else text,
+            "source": "llm",
+        }
+
+    def run_bulk(
+        self,
+        contract_bytes: bytes,
+        coi_files: List[bytes],
+        max_workers: int = 4,
+        coi_names: Optional[List[str]] = None,
+    ) -> Iterator[Dict]:
+        """
+        Checks many COIs against one contract, OCR-ing and condensing the contract only once.
+
+        COIs are processed concurrently and rows are yielded as soon as each COI finishes,
+        so callers can stream a compliance table. Once all rows are yielded, `document_texts`
+        holds the contract, its requirement set and every COI's text for follow-up questions.
+
+        Args:
+            contract_bytes (bytes): Contract PDF file as byte stream.
+            coi_files (List[bytes]): COI PDF files as byte streams.
+            max_workers (int): Number of COIs processed concurrently.
+            coi_names (List[str], optional): COI file names, by index, used to label their text.
+
+        Yields:
+            Dict: One row per COI with "index", "verdict", "risk_score", "gaps", "source"
+            and "error" (set when that COI could not be processed).
+
+        Raises:
+            OCRProcessingError: If the contract cannot be read.
+        """
+        # Step 1: Extract the contract's requirement set once
+        contract_text = extract_text_from_pdf(contract_bytes)
+        requirements = self.extract_requirements(contract_text)
+        self.document_texts = {"Contract": contract_text, "Contract Insurance Requirements": requirements}
+        coi_texts: Dict[int, str] = {}
+
+        # Step 2: Check every COI against it concurrently
+        def _check(idx: int, coi_bytes: bytes) -> Dict:
+            coi_texts[idx] = extract_text_from_pdf(coi_bytes)
+            return self.check_coi(requirements, coi_texts[idx])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_check, idx, coi_bytes): idx for idx, coi_bytes in enumerate(coi_files)}
+            for future in as_completed(futures):
+                row = {"index": futures[future], "error": None}
+                try:
+                    row.update(future.result())
+                except Exception as e:
+                    row.update({"verdict": "ERROR", "risk_score": None, "gaps": "", "source": None, "error": str(e)})
+                yield row
+
+        # Step 3: Keep each COI's text, labelled by file name, for follow-up questions
+        for idx in sorted(coi_texts):
+            name = coi_names[idx] if coi_names else f"COI {idx + 1}"
+            self.document_texts[f"Certificate of Insurance ({name})"] = coi_texts[idx]
+
     def _build_prompt(self, contract_text: str, coi_text: str) -> str:
         """
         Formats a detailed insurance compliance evaluation prompt.
@@ -108,3 +242,83 @@ Please output the results in the following format:
 - Risk Score (1-5): ...
 - ✅ Final Verdict: COMPLIANT or NON-COMPLIANT
 """
+
+    def _build_requirements_prompt(self, contract_text: str) -> str:
+        """
+        Formats the prompt that condenses a contract into its COI insurance requirements.
+
+        Args:
+            contract_text (str): Text from the contract.
+
+        Returns:
+            str: Prompt string.
+        """
+        return f"""
+You are a certified insurance compliance auditor.
+
+Extract ONLY the insurance requirements that a subcontractor's Certificate of Insurance (COI) must satisfy
+under the construction contract below. Output a compact list, one requirement per line, and nothing else:
+
+- <Coverage type>: <minimum limits> (e.g. General Liability: $1,000,000 per occurrence / $2,000,000 aggregate)
+- Additional Insured: <required parties and policies, or Not required>
+- Waiver of Subrogation: <required policies, or Not required>
+- Primary & Noncontributory: <Required or Not required>
+- Certificate Holder: <name/address, if specified>
+- Other: <policy term, carrier rating, notice of cancellation, if specified>
+
+If the contract contains no insurance requirements, output exactly: No insurance requirements found.
+
+### CONTRACT:
+{contract_text}
+"""
+
+    def _build_bulk_prompt(self, requirements: str, coi_text: str) -> str:
+        """
+        Formats the short per-COI prompt used in bulk mode.
+
+        Args:
+            requirements (str): Pre-extracted contract insurance requirements.
+            coi_text (str): Text from the COI.
+
+        Returns:
+            str: Prompt string.
+        """
+        return f"""
+You are a certified insurance compliance auditor. Check the Certificate of Insurance (COI) against the
+contract insurance requirements below: coverages, limits, policy dates, additional insured, waiver of
+subrogation, primary & noncontributory wording and certificate holder.
+
+### CONTRACT INSURANCE REQUIREMENTS:
+{requirements}
+
+### CERTIFICATE OF INSURANCE:
+{coi_text}
+
+Respond in exactly this format:
+- Gaps: <unmet requirements separated by semicolons, or None>
+- Risk Score (1-5): <number>
+- ✅ Final Verdict: COMPLIANT or NON-COMPLIANT
+"""
+
+
+def format_compliance_table(rows: List[Dict], file_names: List[str] = None) -> str:
+    """
+    Renders bulk-mode rows as a Markdown compliance table, ordered by COI index.
+
+    Args:
+        rows (List[Dict]): Rows yielded by `AsuretifyAgent.run_bulk()`.
+        file_names (List[str], optional): COI file names, by index.
+
+    Returns:
+        str: Markdown table.
+    """
+    lines = [
+        "| # | COI | Verdict | Risk Score | Gaps |",
+        "|---|-----|---------|------------|------|",
+    ]
+    for row in sorted(rows, key=lambda r: r["index"]):
+        name = file_names[row["index"]] if file_names else f"COI {row['index'] + 1}"
+        gaps = (row["error"] or row["gaps"] or "").replace("|", "/").replace("\n", " ")
+        risk_score = row["risk_score"] if row["risk_score"] is not None else "–"
+        lines.append(f"| {row['index'] + 1} | {name} | {row['verdict']} | {risk_score} | {gaps} |")
+    return "\n".join(lines)
@@ -1,7 +1,12 @@
 # auto_router.py
 
 import re
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import agent_registry
+from model_utils import bind_model
+from ocr_utils import extract_first_page_text
 
 
 class AgentDetectionError(Exception):
@@ -9,14 +14,194 @@ class AgentDetectionError(Exception):
     pass
 
 
-def detect_agent_with_gemini(gemini_model, query: str, uploaded_files: List[bytes]) -> Tuple[str, List[int]]:
+# === Document Fingerprinting ===
+# Weighted first-page phrases per document role. A file takes the role with the highest score,
+# or "unknown" when no role reaches MIN_ROLE_SCORE.
+DOCUMENT_ROLES = {
+    "acord_coi": [
+        (r"certificate of liability insurance", 5),
+        (r"this certificate is issued as a matter of information", 5),
+        (r"\bacord\b", 3),
+        (r"certificate holder", 3),
+        (r"insurers? affording coverage", 3),
+        (r"\bproducer\b", 1),
+    ],
+    "contract": [
+        (r"subcontract(?:or)? agreement", 4),
+        (r"\bwhereas\b", 3),
+        (r"hereinafter", 3),
+        (r"in witness whereof", 3),
+        (r"indemnif", 2),
+        (r"scope of work", 2),
+        (r"insurance requirements", 2),
+        (r"(?:sub)?contractor shall", 2),
+        (r"\bagreement\b", 1),
+    ],
+    "safety_manual": [
+        (r"safety (?:manual|program|plan|policy)", 4),
+        (r"\bosha\b", 2),
+        (r"personal protective equipment|\bppe\b", 2),
+        (r"hazard communication", 2),
+        (r"lockout|tagout", 2),
+        (r"fall protection", 2),
+        (r"emergency action plan", 2),
+        (r"toolbox talk", 2),
+    ],
+    "wrapup": [
+        (r"owner controlled insurance program|contractor controlled insurance program", 5),
+        (r"\bocip\b|\bccip\b", 4),
+        (r"wrap[- ]?up", 4),
+        (r"enrol(?:l)?ment", 2),
+        (r"\benrolled\b", 1),
+    ],
+    "financials": [
+        (r"balance sheet", 4),
+        (r"financial statements?", 3),
+        (r"income statement|statement of operations", 3),
+        (r"pre-?qualification", 3),
+        (r"bonding capacity|\bsurety\b", 2),
+        (r"experience modification|\bemr\b", 2),
+        (r"net worth|working capital", 2),
+        (r"\brevenue\b", 1),
+    ],
+}
+
+MIN_ROLE_SCORE = 3
+
+UNKNOWN_ROLE = "unknown"
+
+
+def classify_document(text: str) -> str:
+    """
+    Classifies a document from its first-page text using weighted keyword matches.
+
+    Args:
+        text (str): First-page text of the document.
+
+    Returns:
+        str: One of the DOCUMENT_ROLES keys, or "unknown".
+    """
+    text = text.lower()
+    scores = {
+        role: sum(weight * min(len(re.findall(pattern, text)), 3) for pattern, weight in patterns)
+        for role, patterns in DOCUMENT_ROLES.items()
+    }
+    role, score = max(scores.items(), key=lambda item: item[1])
+    return role if score >= MIN_ROLE_SCORE else UNKNOWN_ROLE
+
+
+def _file_bytes(uploaded_file) -> bytes:
+    # Accepts raw bytes or Streamlit's UploadedFile
+    return uploaded_file if isinstance(uploaded_file, (bytes, bytearray)) else uploaded_file.getvalue()
+
+
+def fingerprint_files(uploaded_files: List, max_workers: int = 8) -> List[str]:
+    """
+    Classifies each uploaded PDF from its first page, without any LLM call.
+
+    Args:
+        uploaded_files (List): Uploaded PDF files (bytes or file-like objects with `.getvalue()`).
+        max_workers (int): Threads used to read first pages concurrently.
+
+    Returns:
+        List[str]: Detected role for each file, in upload order.
+    """
+    if not uploaded_files:
+        return []
+
+    contents = [_file_bytes(f) for f in uploaded_files]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(contents))) as pool:
+        texts = list(pool.map(extract_first_page_text, contents))
+    return [classify_document(text) for text in texts]
+
+
+def assign_files(agent: str, roles: List[str]) -> List[List[int]]:
+    """
+    Deterministically assigns files to an agent's arguments based on detected roles.
+
+    All but the agent's last file argument are shared across runs (e.g. one contract); the last
+    argument fans out over every matching file (e.g. each COI), giving one run per file.
+    Files of unknown role fill shared roles that have no confident match, and every remaining
+    unknown file joins the fan-out, but only once at least one file confidently matched one of
+    the agent's roles; otherwise the caller falls back to the model's file indices. Files with
+    another confident role are left out (see `unassigned_files()`).
+
+    Args:
+        agent (str): Registered agent name.
+        roles (List[str]): Detected role for each uploaded file.
+
+    Returns:
+        List[List[int]]: File indices for each agent run, or an empty list when the agent
+        declares no roles, no file matched any of them, or the files cannot fill them.
+    """
+    expected = agent_registry.get_file_roles(agent) if agent_registry.is_registered(agent) else None
+    if not expected or not any(role in expected for role in roles):
+        return []
+
+    used = set()
+    unknown = [i for i, role in enumerate(roles) if role == UNKNOWN_ROLE]
+
+    def _take(role: str) -> Optional[int]:
+        for idx, detected in enumerate(roles):
+            if detected == role and idx not in used:
+                return idx
+        for idx in unknown:
+            if idx not in used:
+                return idx
+        return None
+
+    shared = []
+    for role in expected[:-1]:
+        idx = _take(role)
+        if idx is None:
+            return []
+        used.add(idx)
+        shared.append(idx)
+
+    # Unknown files (e.g. a scan whose first page could not be read) are run rather than dropped
+    per_run = [
+        i for i, role in enumerate(roles)
+        if role in (expected[-1], UNKNOWN_ROLE) and i not in used
+    ]
+    return [shared + [idx] for idx in per_run]
+
+
+def unassigned_files(runs: List[List[int]], file_count: int) -> List[int]:
+    """
+    Returns the indices of uploaded files that are not part of any run.
+
+    Args:
+        runs (List[List[int]]): File indices for each agent run.
+        file_count (int): Number of uploaded files.
+
+    Returns:
+        List[int]: Indices of files the agent will not process, in upload order.
+    """
+    assigned = {idx for file_idxs in runs for idx in file_idxs}
+    return [idx for idx in range(file_count) if idx not in assigned]
+
+
+def _file_count_hint(file_count: int) -> str:
+    return "1 PDF" if file_count == 1 else f"requires {file_count} PDFs"
+
+
+def detect_agent_with_gemini(
+    gemini_model,
+    query: str,
+    uploaded_files: List[bytes],
+    roles: Optional[List[str]] = None,
+) -> Tuple[str, List[int]]:
     """
     Detects which specialized agent should handle the user's query based on the query and uploaded files.
 
+    The model only picks the agent; files are assigned to the agent's arguments from their
+    detected document roles, falling back to the model's indices when roles are inconclusive.
+
     Args:
         gemini_model: An instance of a Gemini-compatible model with a `.generate_content(prompt)` method.
         query (str): The user's natural language query.
         uploaded_files (List[bytes]): List of uploaded PDF files (in byte form).
+        roles (List[str], optional): Pre-computed roles from `fingerprint_files()`.
 
     Returns:
         Tuple[str, List[int]]: Detected agent name and the indices of relevant files.
@@ -25,19 +210,25 @@ def detect_agent_with_gemini(gemini_model, query: str, uploaded_files: List[byte
         AgentDetectionError: If parsing fails or response is ambiguous.
     """
     file_count = len(uploaded_files)
-    file_hint = f"There are {file_count} PDF file(s) uploaded."
+    if roles is None:
+        roles = fingerprint_files(uploaded_files)
+    file_hint = (
+        f"There are {file_count} PDF file(s) uploaded.\n"
+        "Detected file types (index=type): " + ", ".join(f"{i}={role}" for i, role in enumerate(roles))
+    )
+
+    agent_list = "\n".join(
+        f"{i}. **{name}** – {agent_registry.get_description(name)} "
+        f"({_file_count_hint(agent_registry.get_file_count(name))})"
+        for i, name in enumerate(agent_registry.list_agents(), start=1)
+    )
 
     prompt = f"""
 You are an AI routing assistant for an LLM-powered document analysis platform.
 
 Your job is to decide which specialized document processing agent should handle the user's request. Use the following list of agent types:
 
-1. **asuretify** – Compare insurance requirements in a contract vs. a COI (requires 2 PDFs)
-2. **kinetic** – Evaluate subcontractor safety or OSHA policies (1 PDF)
-3. **wrappotal** – Analyze wrap-up (OCIP/CCIP) insurance documents (1 PDF)
-4. **riskguru** – Rate subcontractor risk from company profile or documents (1 PDF)
-5. **prequaligy** – Assess financial prequalification, financials, bonding, etc. (1 PDF)
-6. **anzenn** – Evaluate workplace safety, field safety protocols, or audits (1 PDF)
+{agent_list}
 
 Instructions:
 - Choose the most relevant agent based on the query and file count.
@@ -56,17 +247,25 @@ Query:
 
     try:
         # Call LLM
-        response = gemini_model.generate_content(prompt)
+        response = bind_model(gemini_model, "router").generate_content(prompt)
         response_text = response.text.lower().strip()
 
         # Parse agent name
         agent_match = re.search(r"agent:\s*([a-z_]+)", response_text)
         file_match = re.search(r"files:\s*\[([\d,\s]+)\]", response_text)
 
-        if not agent_match or not file_match:
-            raise AgentDetectionError("Agent or file indices not found in model response.")
+        if not agent_match:
+            raise AgentDetectionError("Agent not found in model response.")
 
         agent = agent_match.group(1).strip()
+
+        runs = assign_files(agent, roles)
+        if runs:
+            return agent, runs[0]
+
+        if not file_match:
+            raise AgentDetectionError("File indices not found in model response.")
+
         file_indices = [int(i.strip()) for i in file_match.group(1).split(",") if i.strip().isdigit()]
 
         if not file_indices or max(file_indices) >= file_count:
@@ -76,3 +275,26 @@ Query:
 
     except Exception as e:
         raise AgentDetectionError(f"Routing failed: {str(e)}")
+
+
+def plan_agent_runs(gemini_model, query: str, uploaded_files: List) -> Tuple[str, List[List[int]]]:
+    """
+    Routes a (possibly large) multi-file upload with a single LLM call.
+
+    Each file is fingerprinted locally, the model picks the agent once for the query, and every
+    matching file is dispatched deterministically (e.g. one contract against each COI).
+
+    Args:
+        gemini_model: An instance of a Gemini-compatible model with a `.generate_content(prompt)` method.
+        query (str): The user's natural language query.
+        uploaded_files (List): Uploaded PDF files (bytes or file-like objects with `.getvalue()`).
+
+    Returns:
+        Tuple[str, List[List[int]]]: Detected agent name and the file indices for each agent run.
+
+    Raises:
+        AgentDetectionError: If routing fails.
+    """
+    roles = fingerprint_files(uploaded_files)
+    agent, file_indices = detect_agent_with_gemini(gemini_model, query, uploaded_files, roles=roles)
+    return agent, assign_files(agent, roles) or [file_indices]
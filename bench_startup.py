@@ -0,0 +1,116 @@
+# bench_startup.py
+
+"""
+Startup-time benchmark for the agent suite.
+
+Imports the suite's modules in a fresh interpreter and fails when importing them takes
+longer than the budget or pulls in one of the heavy dependencies that should only be
+loaded on first use (Gemini SDK, PyMuPDF, Pillow, pytesseract).
+
+Usage:
+    python bench_startup.py [--budget-ms 250] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules imported by every process that serves requests (the Streamlit page, workers)
+STARTUP_MODULES = [
+    "agent_registry",
+    "auto_router",
+    "model_utils",
+    "ocr_utils",
+    "text_normalizer",
+    "followup",
+    "rule_engine",
+    "asuretify",
+    "kinetic",
+    "wrappotal",
+    "riskguru",
+    "prequaligy",
+    "anzenn",
+]
+
+# Default maximum median import time
+DEFAULT_BUDGET_MS = 250.0
+
+# Heavy dependencies that must stay deferred until an agent actually runs
+DEFERRED_MODULES = [
+    "google.generativeai",
+    "fitz",
+    "PIL",
+    "pytesseract",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = [m for m in {deferred!r} if m in sys.modules]
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+
+def measure_startup(runs: int = 5) -> dict:
+    """
+    Imports the startup modules in `runs` fresh interpreters.
+
+    Args:
+        runs (int): Number of cold-start samples to take.
+
+    Returns:
+        dict: Median/max import time in milliseconds and any heavy modules that were loaded.
+    """
+    probe = _PROBE.format(modules=STARTUP_MODULES, deferred=DEFERRED_MODULES)
+    samples = []
+    loaded = set()
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            capture_output=True,
+            text=True,
+            check=True,
+            # The suite's modules are imported from this script's directory
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["elapsed_ms"])
+        loaded.update(result["loaded"])
+
+    return {
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples),
+        "loaded": sorted(loaded),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Maximum median import time in ms.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold-start samples.")
+    args = parser.parse_args()
+
+    stats = measure_startup(args.runs)
+    print(f"[INFO] Import time: median {stats['median_ms']:.1f} ms, max {stats['max_ms']:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if stats["loaded"]:
+        print(f"[ERROR] Heavy modules imported at startup: {', '.join(stats['loaded'])}")
+        failed = True
+    if stats["median_ms"] > args.budget_ms:
+        print("[ERROR] Startup import time exceeds budget.")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# followup.py
+
+import datetime
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+class FollowUpError(Exception):
+    """Raised when a follow-up question cannot be answered."""
+    pass
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9$.,%/-]*")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "were", "what", "when", "which",
+    "who", "why", "with", "does", "do", "did", "there", "their", "they", "any", "all",
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens = (t.strip(".,") for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t and t not in _STOPWORDS]
+
+
+class DocumentChunkIndex:
+    """
+    Small in-memory BM25 index over overlapping chunks of the extracted document text.
+
+    Used when Gemini context caching is unavailable so that only the passages relevant
+    to a follow-up question are sent back to the model.
+    """
+
+    def __init__(self, documents: Dict[str, str], chunk_size: int = 1200, overlap: int = 200):
+        """
+        Args:
+            documents (Dict[str, str]): Mapping of document label (e.g. "Contract") to its text.
+            chunk_size (int): Target chunk length in characters.
+            overlap (int): Number of characters shared between consecutive chunks.
+        """
+        self.chunks: List[Tuple[str, str]] = []
+        for label, text in documents.items():
+            for chunk in self._split(text, chunk_size, overlap):
+                self.chunks.append((label, chunk))
+
+        self._chunk_tokens = [Counter(_tokenize(chunk)) for _, chunk in self.chunks]
+        self._chunk_lengths = [sum(tokens.values()) for tokens in self._chunk_tokens]
+        self._avg_length = (sum(self._chunk_lengths) / len(self._chunk_lengths)) if self.chunks else 0.0
+
+        doc_freq = Counter()
+        for tokens in self._chunk_tokens:
+            doc_freq.update(tokens.keys())
+        total = len(self.chunks)
+        self._idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in doc_freq.items()
+        }
+
+    @staticmethod
+    def _split(text: str, chunk_size: int, overlap: int) -> List[str]:
+        """Splits text into overlapping chunks, preferring paragraph and line boundaries."""
+        text = text.strip()
+        if not text:
+            return []
+
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + chunk_size, len(text))
+            if end < len(text):
+                # Break on the last paragraph/line boundary inside the window if there is one
+                boundary = max(text.rfind("\n\n", start, end), text.rfind("\n", start, end))
+                if boundary > start + chunk_size // 2:
+                    end = boundary
+            chunks.append(text[start:end].strip())
+            if end >= len(text):
+                break
+            # Start the next chunk on a line or word boundary inside the overlap window
+            next_start = max(end - overlap, start + 1)
+            newline = text.find("\n", next_start, end)
+            space = text.find(" ", next_start, end)
+            if newline != -1:
+                next_start = newline + 1
+            elif space != -1:
+                next_start = space + 1
+            start = next_start
+
+        return [c for c in chunks if c]
+
+    def search(self, query: str, top_k: int = 4) -> List[Tuple[str, str]]:
+        """
+        Returns the chunks most relevant to the query, in document order.
+
+        Args:
+            query (str): Natural language question.
+            top_k (int): Maximum number of chunks to return.
+
+        Returns:
+            List[Tuple[str, str]]: (document label, chunk text) pairs.
+        """
+        terms = _tokenize(query)
+        if not terms or not self.chunks:
+            return self.chunks[:top_k]
+
+        k1, b = 1.5, 0.75
+        scores = []
+        for idx, tokens in enumerate(self._chunk_tokens):
+            length_norm = k1 * (1 - b + b * self._chunk_lengths[idx] / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tokens.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (k1 + 1) / (freq + length_norm)
+            scores.append((score, idx))
+
+        ranked = [idx for score, idx in sorted(scores, reverse=True)[:top_k] if score > 0]
+        if not ranked:
+            ranked = list(range(min(top_k, len(self.chunks))))
+        return [self.chunks[idx] for idx in sorted(ranked)]
+
+
+class FollowUpSession:
+    """
+    Conversational follow-up mode on top of an agent run.
+
+    Keeps the extracted document text and the agent's first response as session context,
+    so that follow-up questions never trigger a new OCR pass. On the first question the
+    context is stored in a Gemini context cache where the model supports it; otherwise a
+    local chunk index is used and only the relevant passages are sent with each question.
+    """
+
+    def __init__(
+        self,
+        model,
+        agent_name: str,
+        documents: Dict[str, str],
+        initial_response: str,
+        use_cache: bool = True,
+        cache_ttl_minutes: int = 60,
+        top_k: int = 4,
+        max_history: int = 4,
+    ):
+        """
+        Args:
+            model: Gemini-compatible model with a `.generate_content(prompt)` method.
+            agent_name (str): Name of the agent that produced the initial response.
+            documents (Dict[str, str]): Extracted text per document label.
+            initial_response (str): The agent's first report.
+            use_cache (bool): Try Gemini context caching (on the first question) before falling
+                back to retrieval.
+            cache_ttl_minutes (int): Lifetime of the Gemini context cache.
+            top_k (int): Number of retrieved passages sent per question in retrieval mode.
+            max_history (int): Number of previous question/answer turns kept in the prompt.
+        """
+        if not documents:
+            raise FollowUpError("No extracted document text is available for follow-up questions.")
+
+        self.model = model
+        self.agent_name = agent_name
+        self.documents = documents
+        self.initial_response = initial_response
+        self.top_k = top_k
+        self.max_history = max_history
+        self.history: List[Tuple[str, str]] = []
+
+        self._use_cache = use_cache
+        self._cache_ttl_minutes = cache_ttl_minutes
+        self._context_ready = False
+        self._cache = None
+        self._cached_model = None
+        self._index: Optional[DocumentChunkIndex] = None
+
+    @property
+    def mode(self) -> str:
+        """
+        Either "cache" (Gemini context cache), "retrieval" (local chunk index) or "pending"
+        before the first question has been asked.
+        """
+        if not self._context_ready:
+            return "pending"
+        return "cache" if self._cached_model is not None else "retrieval"
+
+    def _ensure_context(self) -> None:
+        """
+        Sets up the session context on first use, so runs that never get a follow-up question
+        do not pay for uploading the documents to a context cache.
+        """
+        if self._context_ready:
+            return
+        if self._use_cache:
+            self._create_cache(self._cache_ttl_minutes)
+        if self._cached_model is None:
+            self._index = DocumentChunkIndex(self.documents)
+        self._context_ready = True
+
+    def _create_cache(self, ttl_minutes: int) -> None:
+        """Stores the documents and first response in a Gemini context cache, if supported."""
+        model_name = getattr(self.model, "model_name", None)
+        if not model_name:
+            return
+
+        try:
+            import google.generativeai as genai
+            from google.generativeai import caching
+
+            self._cache = caching.CachedContent.create(
+                model=model_name,
+                display_name=f"injala-{self.agent_name}-followup",
+                system_instruction=(
+                    f"You are the {self.agent_name} document analysis agent answering follow-up "
+                    "questions about documents you have already reviewed. Answer only from the "
+                    "document text and your earlier report."
+                ),
+                contents=[self._context_block()],
+                ttl=datetime.timedelta(minutes=ttl_minutes),
+            )
+            self._cached_model = genai.GenerativeModel.from_cached_content(cached_content=self._cache)
+        except Exception as e:
+            # Older models and short documents (below the cache token minimum) are not cacheable
+            print(f"[INFO] Context caching unavailable, using local retrieval: {e}")
+            self._cache = None
+            self._cached_model = None
+
+    def _context_block(self) -> str:
+        parts = [
+            f"=== {label.upper()} TEXT START ===\n{text}\n=== {label.upper()} TEXT END ==="
+            for label, text in self.documents.items()
+        ]
+        parts.append(f"=== YOUR INITIAL REPORT START ===\n{self.initial_response}\n=== YOUR INITIAL REPORT END ===")
+        return "\n\n".join(parts)
+
+    def _history_block(self) -> str:
+        turns = self.history[-self.max_history:]
+        if not turns:
+            return ""
+        lines = ["Previous follow-up questions and answers:"]
+        for question, answer in turns:
+            lines.append(f"Q: {question}\nA: {answer}")
+        return "\n\n".join(lines) + "\n\n"
+
+    def _build_prompt(self, question: str) -> str:
+        """
+        Builds the follow-up prompt. In cache mode the documents are already in the cached
+        context; in retrieval mode only the top-ranked passages are included.
+
+        Args:
+            question (str): The user's follow-up question.
+
+        Returns:
+            str: Prompt string.
+        """
+        if self._index is None:
+            return (
+                f"{self._history_block()}"
+                f"Follow-up question: {question}\n\n"
+                "Answer concisely, quoting exact figures from the documents where relevant. "
+                "If the documents do not contain the answer, say so."
+            )
+
+        passages = "\n\n".join(
+            f"[{label}]\n{chunk}" for label, chunk in self._index.search(question, self.top_k)
+        )
+        return (
+            f"You are the {self.agent_name} document analysis agent answering a follow-up question "
+            "about documents you have already reviewed.\n\n"
+            "=== YOUR INITIAL REPORT START ===\n"
+            f"{self.initial_response}\n"
+            "=== YOUR INITIAL REPORT END ===\n\n"
+            "=== RELEVANT DOCUMENT PASSAGES START ===\n"
+            f"{passages}\n"
+            "=== RELEVANT DOCUMENT PASSAGES END ===\n\n"
+            f"{self._history_block()}"
+            f"Follow-up question: {question}\n\n"
+            "Answer concisely, quoting exact figures from the passages where relevant. "
+            "If the passages do not contain the answer, say so."
+        )
+
+    def ask(self, question: str) -> str:
+        """
+        Answers a follow-up question using the session context.
+
+        Args:
+            question (str): The user's follow-up question.
+
+        Returns:
+            str: The model's answer.
+
+        Raises:
+            FollowUpError: If the question is empty or the model call fails.
+        """
+        if not question or not question.strip():
+            raise FollowUpError("Follow-up question must not be empty.")
+
+        self._ensure_context()
+        prompt = self._build_prompt(question.strip())
+        model = self._cached_model or self.model
+
+        try:
+            response = model.generate_content(prompt)
+            answer = response.text.strip()
+        except Exception as e:
+            raise FollowUpError(f"Follow-up failed: {str(e)}")
+
+        self.history.append((question.strip(), answer))
+        return answer
+
+    def close(self) -> None:
+        """Deletes the Gemini context cache, if one was created; later questions use retrieval."""
+        self._use_cache = False
+        if self._cache is not None:
+            try:
+                self._cache.delete()
+            except Exception as e:
+                print(f"[WARN] Failed to delete context cache: {e}")
+            self._cache = None
+            self._cached_model = None
+            self._index = DocumentChunkIndex(self.documents)
+            self._context_ready = True
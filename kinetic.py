@@ -1,6 +1,7 @@
 # kinetic.py
 
 from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
 
 
 class KineticAgent:
@@ -9,6 +10,7 @@ class KineticAgent:
     """
     def __init__(self, gemini_model):
         self.model = gemini_model
+        self.document_texts = {}
 
     def run(self, file_bytes: bytes) -> str:
         """
@@ -31,18 +33,38 @@ class KineticAgent:
             if not extracted_text.strip():
                 return "OCR failed to extract meaningful text from the document."
 
-            # Step 3: Build structured OSHA prompt
-            prompt = self._build_prompt(extracted_text)
-
-            # Step 4: Analyze with Gemini model
-            response = self.model.generate_content(prompt)
-
-            # Step 5: Return output text
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(extracted_text)
 
         except Exception as e:
             return f"An error occurred during OSHA compliance evaluation: {str(e)}"
 
+    def analyze(self, extracted_text: str) -> str:
+        """
+        Evaluates already-extracted safety policy text for OSHA compliance.
+
+        Args:
+            extracted_text (str): OCR-extracted document text.
+
+        Returns:
+            str: Structured OSHA compliance evaluation.
+        """
+        self.document_texts = {"Document": extracted_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("kinetic", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Build structured OSHA prompt
+        prompt = screen.annotate_prompt(self._build_prompt(extracted_text))
+
+        # Step 3: Analyze with Gemini model
+        response = self.model.generate_content(prompt)
+
+        # Step 4: Return output text
+        return response.text.strip()
+
     def _build_prompt(self, extracted_text: str) -> str:
         """
         Builds a detailed OSHA compliance evaluation prompt for the LLM.
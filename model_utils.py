@@ -1,6 +1,13 @@
 # gemini_loader.py
 
-import google.generativeai as genai
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
 
 
 class GeminiLoadError(Exception):
@@ -28,6 +35,9 @@ def load_gemini(api_key: str, model_name: str = "gemini-2.0-flash"):
                 "❌ Gemini API key must be provided explicitly to load_gemini()."
             )
 
+        # Imported here so that importing this module does not pull in the Gemini SDK
+        import google.generativeai as genai
+
         # Configure Gemini SDK
         genai.configure(api_key=api_key)
 
@@ -37,3 +47,289 @@ def load_gemini(api_key: str, model_name: str = "gemini-2.0-flash"):
 
     except Exception as e:
         raise GeminiLoadError(f"⚠️ Failed to load Gemini model: {str(e)}")
+
+
+# === Model Cascade ===
+
+# Tiers ordered from fastest/cheapest to strongest
+DEFAULT_TIERS = ["gemini-2.0-flash-lite", "gemini-2.0-flash", "gemini-2.5-pro"]
+
+# Environment variable pointing at a JSON file that overrides DEFAULT_POLICIES per agent
+MODEL_POLICY_FILE_ENV = "INJALA_MODEL_POLICY_FILE"
+
+# Per-agent escalation policy. Agents without an entry use "default"; listed keys override it.
+#   start_tier        – tier index tried first
+#   max_tier          – highest tier the request may escalate to
+#   long_input_chars  – prompts longer than this start one tier higher
+#   required_patterns – regexes the response must match (schema check); a miss escalates
+#   min_avg_logprob   – escalate when the response's average token log-probability is lower
+DEFAULT_POLICIES: Dict[str, Dict] = {
+    "default": {
+        "start_tier": 0,
+        "max_tier": 2,
+        "long_input_chars": 60000,
+        "required_patterns": [],
+        "min_avg_logprob": -0.5,
+    },
+    "router": {
+        "max_tier": 1,
+        "required_patterns": [r"agent:\s*[a-z_]+", r"files:\s*\[\s*\d"],
+        "min_avg_logprob": None,
+    },
+    "asuretify": {"required_patterns": [r"final verdict", r"risk score"]},
+    "asuretify_requirements": {"required_patterns": [r"liability|no insurance requirements"]},
+    "kinetic": {"required_patterns": [r"final verdict", r"risk score"]},
+    "wrappotal": {"required_patterns": [r"wrap-up program detected", r"document valid"]},
+    "riskguru": {"required_patterns": [r"overall risk rating", r"recommendation"]},
+    "prequaligy": {"required_patterns": [r"prequalification status", r"recommendation"]},
+    "anzenn": {"required_patterns": [r"overall compliance assessment", r"risks and recommendations"]},
+    "followup": {"max_tier": 1, "min_avg_logprob": None},
+}
+
+
+def _avg_logprob(response) -> Optional[float]:
+    """Average token log-probability of the first candidate, when the API reports it."""
+    try:
+        value = response.candidates[0].avg_logprobs
+        return float(value) if value else None
+    except Exception:
+        return None
+
+
+class CascadeStats:
+    """Thread-safe call, escalation and latency counters for a model cascade."""
+
+    def __init__(self, tier_names: List[str], window: int = 500):
+        self._lock = threading.Lock()
+        self.tier_names = tier_names
+        self.requests = 0
+        self.escalated_requests = 0
+        self.calls = [0] * len(tier_names)
+        self.escalations: Dict[str, int] = {}
+        self._latencies = [deque(maxlen=window) for _ in tier_names]
+
+    def record_call(self, tier: int, seconds: float) -> None:
+        with self._lock:
+            self.calls[tier] += 1
+            self._latencies[tier].append(seconds)
+
+    def record_request(self, escalation_reasons: List[str]) -> None:
+        with self._lock:
+            self.requests += 1
+            if escalation_reasons:
+                self.escalated_requests += 1
+            for reason in escalation_reasons:
+                self.escalations[reason] = self.escalations.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            Dict: Request count, escalation rate and reasons, and per-tier call counts and latency.
+        """
+        with self._lock:
+            tiers = {}
+            for idx, name in enumerate(self.tier_names):
+                latencies = sorted(self._latencies[idx])
+                tiers[name] = {
+                    "calls": self.calls[idx],
+                    "median_ms": round(1000 * statistics.median(latencies), 1) if latencies else None,
+                    "p95_ms": round(1000 * latencies[round(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+                }
+            return {
+                "requests": self.requests,
+                "escalation_rate": round(self.escalated_requests / self.requests, 3) if self.requests else 0.0,
+                "escalations": dict(self.escalations),
+                "tiers": tiers,
+            }
+
+
+class ModelCascade:
+    """
+    Tiered model policy: requests go to the fastest tier first and escalate to a stronger
+    model only on low confidence, schema-parse failure, errors, or long input.
+
+    Exposes `.generate_content(prompt)` so it can be passed anywhere a Gemini model is expected;
+    `for_agent(name)` returns a view that applies that agent's policy.
+    """
+
+    def __init__(self, models: List, policies: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            models (List): Gemini-compatible models ordered from fastest to strongest.
+            policies (Dict[str, Dict], optional): Per-agent policies (default: DEFAULT_POLICIES).
+
+        Raises:
+            GeminiLoadError: If no models are given.
+        """
+        if not models:
+            raise GeminiLoadError("⚠️ A model cascade needs at least one model tier.")
+
+        self.models = models
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        tier_names = [getattr(m, "model_name", f"tier-{i}") for i, m in enumerate(models)]
+        self.stats = CascadeStats(tier_names)
+
+    @property
+    def model_name(self) -> str:
+        return self.stats.tier_names[0]
+
+    def policy_for(self, agent_name: str) -> Dict:
+        policy = dict(self.policies.get("default", DEFAULT_POLICIES["default"]))
+        policy.update(self.policies.get(agent_name, {}))
+        last_tier = len(self.models) - 1
+        policy["start_tier"] = min(policy.get("start_tier", 0), last_tier)
+        policy["max_tier"] = min(policy.get("max_tier", last_tier), last_tier)
+        return policy
+
+    def for_agent(self, agent_name: str) -> "CascadeModel":
+        """Returns a model view that applies `agent_name`'s escalation policy."""
+        return CascadeModel(self, agent_name)
+
+    def generate_content(self, prompt: str):
+        return self.generate(prompt, "default")
+
+    def _escalation_reason(self, response, policy: Dict) -> Optional[str]:
+        text = response.text or ""
+        for pattern in policy.get("required_patterns") or []:
+            if not re.search(pattern, text, re.IGNORECASE):
+                return "schema"
+
+        threshold = policy.get("min_avg_logprob")
+        if threshold is not None:
+            avg_logprob = _avg_logprob(response)
+            if avg_logprob is not None and avg_logprob < threshold:
+                return "low_confidence"
+
+        return None
+
+    def generate(self, prompt: str, agent_name: str = "default"):
+        """
+        Sends the prompt through the cascade using the agent's policy.
+
+        Args:
+            prompt (str): Prompt string.
+            agent_name (str): Policy key (agent name, "router", "followup" or "default").
+
+        Returns:
+            The response of the first tier that passes the checks, or the last response obtained.
+
+        Raises:
+            Exception: The last tier's error, if no tier returned a response.
+        """
+        policy = self.policy_for(agent_name)
+        tier = policy["start_tier"]
+        reasons = []
+
+        long_input = policy.get("long_input_chars")
+        if long_input and len(prompt) > long_input and tier < policy["max_tier"]:
+            tier += 1
+            reasons.append("long_input")
+
+        # Last response whose text could be read and checked; a failed or blocked tier never replaces it
+        last_good = None
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.models[tier].generate_content(prompt)
+                reason = self._escalation_reason(response, policy)
+                last_good = response
+            except Exception as e:
+                if tier >= policy["max_tier"]:
+                    self.stats.record_request(reasons)
+                    # Prefer a lower tier's imperfect answer over no answer at all
+                    if last_good is not None:
+                        return last_good
+                    raise
+                print(f"[WARN] Model tier {self.stats.tier_names[tier]} failed, escalating: {e}")
+                reason = "error"
+            finally:
+                self.stats.record_call(tier, time.perf_counter() - start)
+
+            if reason is None or tier >= policy["max_tier"]:
+                break
+            reasons.append(reason)
+            tier += 1
+
+        self.stats.record_request(reasons)
+        return last_good
+
+
+class CascadeModel:
+    """Per-agent view of a `ModelCascade` with the Gemini `.generate_content(prompt)` interface."""
+
+    def __init__(self, cascade: ModelCascade, agent_name: str):
+        self.cascade = cascade
+        self.agent_name = agent_name
+
+    @property
+    def model_name(self) -> str:
+        return self.cascade.stats.tier_names[self.cascade.policy_for(self.agent_name)["start_tier"]]
+
+    def for_agent(self, agent_name: str) -> "CascadeModel":
+        """Returns a sibling view on the same cascade with another policy."""
+        return self.cascade.for_agent(agent_name)
+
+    def generate_content(self, prompt: str):
+        return self.cascade.generate(prompt, self.agent_name)
+
+
+def bind_model(model, agent_name: str):
+    """
+    Applies an agent's cascade policy when `model` is a `ModelCascade` (or a view on one);
+    plain models are returned unchanged.
+    """
+    if isinstance(model, (ModelCascade, CascadeModel)):
+        return model.for_agent(agent_name)
+    return model
+
+
+def load_model_policies(path: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Loads cascade policies from a JSON file and merges them over DEFAULT_POLICIES.
+
+    Args:
+        path (str, optional): JSON file mapping agent names to policy overrides
+            (default: the file named by INJALA_MODEL_POLICY_FILE, if set).
+
+    Returns:
+        Dict[str, Dict]: Merged policies.
+
+    Raises:
+        GeminiLoadError: If the file cannot be read or is not a JSON object.
+    """
+    path = path or os.environ.get(MODEL_POLICY_FILE_ENV)
+    if not path:
+        return dict(DEFAULT_POLICIES)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except Exception as e:
+        raise GeminiLoadError(f"⚠️ Failed to load model policies from {path}: {e}")
+
+    if not isinstance(overrides, dict):
+        raise GeminiLoadError(f"⚠️ Model policy file must contain a JSON object keyed by agent name: {path}")
+
+    merged = {name: dict(policy) for name, policy in DEFAULT_POLICIES.items()}
+    for name, policy in overrides.items():
+        merged.setdefault(name, {}).update(policy)
+    return merged
+
+
+def load_model_cascade(api_key: str, tiers: Optional[List[str]] = None, policies: Optional[Dict[str, Dict]] = None) -> ModelCascade:
+    """
+    Initializes a Gemini model per tier and returns them as a `ModelCascade`.
+
+    Args:
+        api_key (str): API key for Gemini. Must be provided explicitly.
+        tiers (List[str], optional): Model names from fastest to strongest (default: DEFAULT_TIERS).
+        policies (Dict[str, Dict], optional): Per-agent policies (default: `load_model_policies()`).
+
+    Returns:
+        ModelCascade: Configured cascade.
+
+    Raises:
+        GeminiLoadError: If the API key is missing or a tier fails to load.
+    """
+    models = [load_gemini(api_key, name) for name in (tiers or DEFAULT_TIERS)]
+    return ModelCascade(models, policies if policies is not None else load_model_policies())
@@ -1,26 +1,58 @@
 # ocr_utils.py
 
 import io
-from typing import List
-import pytesseract
-from PIL import Image, ImageOps
-import fitz  # PyMuPDF
+import threading
+from typing import TYPE_CHECKING, List
+
+from text_normalizer import NormalizedText, get_normalization_stats, normalize_pages
+
+# PyMuPDF, Pillow and pytesseract are imported inside the functions that use them so that
+# importing this module (and every agent) stays cheap on cold start.
+if TYPE_CHECKING:
+    from PIL import Image
 
 class OCRProcessingError(Exception):
     """Custom exception for OCR or PDF processing failures."""
     pass
 
 # ✅ Explicit Tesseract path for Streamlit deployments
-pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
+TESSERACT_CMD = "/usr/bin/tesseract"
+
+_tesseract_lock = threading.Lock()
+_tesseract = None
+
+def get_tesseract():
+    """
+    Returns the configured pytesseract module, initializing it once per process.
+
+    The Tesseract binary path is set and its version checked on first use rather than at
+    import time, so processes that never run OCR never shell out to `tesseract --version`.
+
+    Returns:
+        module: The configured `pytesseract` module.
+    """
+    global _tesseract
+    if _tesseract is not None:
+        return _tesseract
+
+    with _tesseract_lock:
+        if _tesseract is None:
+            import pytesseract
+
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
 
-# ✅ Confirm Tesseract availability on startup
-try:
-    tess_version = pytesseract.get_tesseract_version()
-    print(f"[INFO] Tesseract version: {tess_version}")
-except Exception as e:
-    print(f"[ERROR] Tesseract not accessible: {e}")
+            # ✅ Confirm Tesseract availability on first use
+            try:
+                tess_version = pytesseract.get_tesseract_version()
+                print(f"[INFO] Tesseract version: {tess_version}")
+            except Exception as e:
+                print(f"[ERROR] Tesseract not accessible: {e}")
+
+            _tesseract = pytesseract
 
-def extract_images_from_pdf(file_bytes: bytes) -> List[Image.Image]:
+    return _tesseract
+
+def extract_images_from_pdf(file_bytes: bytes) -> List["Image.Image"]:
     """
     Extracts high-resolution images from each page of a PDF.
 
@@ -34,6 +66,9 @@ def extract_images_from_pdf(file_bytes: bytes) -> List[Image.Image]:
         OCRProcessingError: If PDF processing fails.
     """
     try:
+        import fitz  # PyMuPDF
+        from PIL import Image
+
         doc = fitz.open(stream=file_bytes, filetype="pdf")
         images = []
 
@@ -54,20 +89,11 @@ def extract_images_from_pdf(file_bytes: bytes) -> List[Image.Image]:
     except Exception as e:
         raise OCRProcessingError(f"Failed to read PDF: {e}") from e
 
-def run_ocr_on_images(images: List[Image.Image], lang: str = "eng") -> str:
-    """
-    Runs OCR on a list of images using Tesseract.
-
-    Args:
-        images (List[Image.Image]): List of PIL Image objects.
-        lang (str, optional): Language code for OCR (default: 'eng').
+def _ocr_pages(images: List["Image.Image"], lang: str) -> List[str]:
+    """Runs Tesseract on each image and returns the raw text of every page, in order."""
+    from PIL import ImageOps
 
-    Returns:
-        str: Combined extracted text from all images.
-
-    Raises:
-        OCRProcessingError: If OCR fails on all images.
-    """
+    pytesseract = get_tesseract()
     extracted_text = []
     config = "--psm 6"  # Assume a uniform block of text for best page OCR
 
@@ -94,9 +120,120 @@ def run_ocr_on_images(images: List[Image.Image], lang: str = "eng") -> str:
             print(f"[WARN] OCR failed on image {idx}: {e}")
             extracted_text.append("")
 
-    combined_text = "\n\n".join(filter(None, extracted_text)).strip()
+    return extracted_text
+
+def _normalize(pages: List[str]) -> NormalizedText:
+    """Normalizes OCR pages, logs the token reduction and adds it to the process-wide totals."""
+    normalized = normalize_pages(pages)
+    print(f"[INFO] OCR text normalized: {normalized.summary()}")
+    get_normalization_stats().record(normalized)
+    return normalized
+
+def run_ocr_on_images(images: List["Image.Image"], lang: str = "eng", normalize: bool = True) -> str:
+    """
+    Runs OCR on a list of images using Tesseract.
+
+    Args:
+        images (List[Image.Image]): List of PIL Image objects.
+        lang (str, optional): Language code for OCR (default: 'eng').
+        normalize (bool, optional): Strip repeated headers/footers, page numbers, hyphenation and
+            table-rule noise before returning (default: True). See `text_normalizer.normalize_pages`;
+            the token reduction is added to `text_normalizer.get_normalization_stats()`.
+
+    Returns:
+        str: Combined extracted text from all images.
+
+    Raises:
+        OCRProcessingError: If OCR fails on all images.
+    """
+    extracted_text = _ocr_pages(images, lang)
+
+    if normalize:
+        combined_text = _normalize(extracted_text).text
+    else:
+        combined_text = "\n\n".join(filter(None, extracted_text)).strip()
 
     if not combined_text:
         raise OCRProcessingError("OCR did not extract any text from the images.")
 
     return combined_text
+
+def extract_text_from_pdf(file_bytes: bytes, lang: str = "eng", normalize: bool = True) -> str:
+    """
+    Renders a PDF and runs OCR on every page.
+
+    Defined at module level so it can be shipped to a process pool for CPU-bound OCR.
+
+    Args:
+        file_bytes (bytes): PDF file content in binary format.
+        lang (str, optional): Language code for OCR (default: 'eng').
+        normalize (bool, optional): Normalize the OCR text (default: True).
+
+    Returns:
+        str: Combined extracted text from all pages.
+
+    Raises:
+        OCRProcessingError: If the PDF cannot be rendered or no text is extracted.
+    """
+    images = extract_images_from_pdf(file_bytes)
+    return run_ocr_on_images(images, lang=lang, normalize=normalize)
+
+def extract_normalized_text_from_pdf(file_bytes: bytes, lang: str = "eng") -> NormalizedText:
+    """
+    Renders a PDF, runs OCR on every page and returns the normalized text with its statistics.
+
+    Used by process-pool callers, which cannot see the worker's `get_normalization_stats()`
+    totals and record the returned statistics themselves.
+
+    Args:
+        file_bytes (bytes): PDF file content in binary format.
+        lang (str, optional): Language code for OCR (default: 'eng').
+
+    Returns:
+        NormalizedText: Normalized text and token-reduction statistics.
+
+    Raises:
+        OCRProcessingError: If the PDF cannot be rendered or no text is extracted.
+    """
+    images = extract_images_from_pdf(file_bytes)
+    normalized = _normalize(_ocr_pages(images, lang))
+    if not normalized.text:
+        raise OCRProcessingError("OCR did not extract any text from the images.")
+    return normalized
+
+def extract_first_page_text(file_bytes: bytes, min_chars: int = 50, ocr_dpi: int = 200) -> str:
+    """
+    Cheaply reads the first page of a PDF for document fingerprinting.
+
+    Uses the PDF's embedded text layer when it has one and falls back to OCR of a
+    render of the first page (scanned documents), at a resolution that still reads the small
+    print on ACORD forms.
+
+    Args:
+        file_bytes (bytes): PDF file content in binary format.
+        min_chars (int, optional): Minimum text-layer length before falling back to OCR (default: 50).
+        ocr_dpi (int, optional): Render resolution for the OCR fallback (default: 200).
+
+    Returns:
+        str: First-page text, or an empty string if nothing could be read.
+    """
+    try:
+        import fitz  # PyMuPDF
+        from PIL import Image
+
+        doc = fitz.open(stream=file_bytes, filetype="pdf")
+        if doc.page_count == 0:
+            return ""
+
+        page = doc[0]
+        text = page.get_text().strip()
+        if len(text) >= min_chars:
+            return text
+
+        pix = page.get_pixmap(dpi=ocr_dpi, alpha=False)
+        thumbnail = Image.open(io.BytesIO(pix.tobytes("png"))).convert("L")
+        return get_tesseract().image_to_string(thumbnail, config="--psm 6").strip()
+
+    except Exception as e:
+        print(f"[WARN] Failed to read first page for fingerprinting: {e}")
+        return ""
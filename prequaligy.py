@@ -1,6 +1,7 @@
 # prequaligy.py
 
 from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
 
 class PrequaligyAgent:
     """
@@ -8,6 +9,7 @@ class PrequaligyAgent:
     """
     def __init__(self, gemini_model):
         self.model = gemini_model
+        self.document_texts = {}
 
     def run(self, file_bytes: bytes) -> str:
         """
@@ -31,16 +33,36 @@ class PrequaligyAgent:
             if not extracted_text.strip():
                 return "Text extraction failed or no readable data found."
 
-            # Step 3: Generate the prequal assessment prompt
-            prompt = self._build_prompt(extracted_text)
-
-            # Step 4: Invoke Gemini model
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(extracted_text)
 
         except Exception as e:
             return f"An error occurred during Prequaligy analysis: {e}"
 
+    def analyze(self, extracted_text: str) -> str:
+        """
+        Assesses an already-extracted prequalification packet.
+
+        Args:
+            extracted_text (str): OCR-extracted document text.
+
+        Returns:
+            str: AI-generated prequalification report with risks, recommendations, and pass/fail assessment.
+        """
+        self.document_texts = {"Document": extracted_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("prequaligy", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Generate the prequal assessment prompt
+        prompt = screen.annotate_prompt(self._build_prompt(extracted_text))
+
+        # Step 3: Invoke Gemini model
+        response = self.model.generate_content(prompt)
+        return response.text.strip()
+
     def _build_prompt(self, extracted_text: str) -> str:
         """
         Constructs the assessment prompt for the AI model.
@@ -1,6 +1,7 @@
 # riskguru.py
 
 from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
 
 
 class RiskguruAgent:
@@ -9,6 +10,7 @@ class RiskguruAgent:
     """
     def __init__(self, gemini_model):
         self.model = gemini_model
+        self.document_texts = {}
 
     def run(self, file_bytes: bytes) -> str:
         """
@@ -31,16 +33,36 @@ class RiskguruAgent:
             if not extracted_text.strip():
                 return "OCR failed to extract meaningful text from the document."
 
-            # Step 3: Generate structured prompt
-            prompt = self._build_prompt(extracted_text)
-
-            # Step 4: Query Gemini model
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(extracted_text)
 
         except Exception as e:
             return f"An error occurred during risk assessment: {e}"
 
+    def analyze(self, extracted_text: str) -> str:
+        """
+        Rates subcontractor risk from already-extracted document text.
+
+        Args:
+            extracted_text (str): OCR-extracted document text.
+
+        Returns:
+            str: A risk rating summary with detailed observations.
+        """
+        self.document_texts = {"Document": extracted_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("riskguru", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Generate structured prompt
+        prompt = screen.annotate_prompt(self._build_prompt(extracted_text))
+
+        # Step 3: Query Gemini model
+        response = self.model.generate_content(prompt)
+        return response.text.strip()
+
     def _build_prompt(self, extracted_text: str) -> str:
         """
         Builds a structured prompt for the AI model to analyze subcontractor risk.
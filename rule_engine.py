@@ -0,0 +1,503 @@
+# rule_engine.py
+
+import datetime
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+
+class RuleConfigError(Exception):
+    """Raised when a pre-screen rule definition is invalid."""
+    pass
+
+
+# Environment variable pointing at a JSON file that overrides DEFAULT_RULES per agent
+RULES_FILE_ENV = "INJALA_RULES_FILE"
+
+_DATE = r"\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2}"
+
+# ACORD 25 policy row tail: POLICY NUMBER, POLICY EFF, POLICY EXP
+_POLICY_ROW = rf"[A-Z0-9][\w\-/]*[\s|]+(?:{_DATE})[\s|]+(?:{_DATE})"
+
+# Waiver of subrogation wording ("waiver of subrogation", "waives all rights of subrogation")
+_WAIVER_WORDING = r"waiver\s+of\s+subrogation|waive[sd]?\s+(?:its\s+|all\s+)?(?:rights?\s+of\s+)?subrogation"
+
+# Sentence-level wording that makes a contract clause conditional or negative rather than a requirement
+_NOT_REQUIRED = (
+    r"\b(?:not|no|never|none|neither|nor|without|unless|optional)\b|"
+    r"\bif\s+(?:so\s+)?(?:required|requested|applicable|any)\b|"
+    r"\b(?:where|when|as)\s+(?:required|applicable)\b|\bto\s+the\s+extent\b|\bmay\s+(?:be\s+)?request"
+)
+
+# EMR stated right after its label, e.g. "EMR: 0.87", "Experience Modification Rate (EMR) 1.12"
+_EMR = r"\b(?:E\.?M\.?R\.?|experience\s+modification\s+rate(?:\s*\(EMR\))?)(?:\s+(?:is|of))?[\s:=]*(\d\.\d{1,3})\b"
+
+# === Default Rules ===
+# Each agent maps to a list of rule definitions. Supported rule types:
+#   regex  – fires when `pattern` is "present" or "absent" in the document text
+#   date   – extracts dates with `pattern` and compares them to today ("before_today"/"after_today")
+#   number – extracts numbers with `pattern` and compares them to `threshold` (">", ">=", "<", "<=")
+# Optional keys: `document` (restrict to one document label), `group` (regex capture group),
+# `aggregate` ("min"/"max"/"first"), `value_pattern` (number rules: numbers to pull out of each match),
+# `requires` ({"document", "pattern", "unless"} precondition, or a list of them that must all match;
+# with `unless`, the pattern must match in a sentence that does not also match `unless`),
+# `inconclusive_if` (list of {"document", "pattern", "reason"}; when one matches, a fired rule is only
+# reported as a fact for the model), `decisive` (skip the LLM when the rule fires), `verdict`,
+# `risk_score` and `fact` (message template with {value}).
+DEFAULT_RULES: Dict[str, List[Dict]] = {
+    "asuretify": [
+        {
+            "name": "expired_policy",
+            "type": "date",
+            "document": "Certificate of Insurance",
+            # ACORD 25 rows list POLICY EFF and POLICY EXP side by side; the second date is the expiration
+            "pattern": rf"\b(?:{_DATE})\s+({_DATE})\b",
+            "group": 1,
+            "aggregate": "min",
+            "condition": "before_today",
+            "decisive": True,
+            "verdict": "NON-COMPLIANT",
+            "risk_score": 5,
+            "fact": "Earliest policy expiration date on the COI: {value}",
+        },
+        {
+            "name": "waiver_of_subrogation_missing",
+            "type": "regex",
+            "document": "Certificate of Insurance",
+            # Only evaluated when the contract affirmatively asks for a waiver and the COI's policy table was read
+            "requires": [
+                {
+                    "document": "Contract",
+                    "pattern": _WAIVER_WORDING,
+                    # "is not required", "if required", "to the extent applicable", ... are not a requirement
+                    "unless": _NOT_REQUIRED,
+                },
+                {"document": "Certificate of Insurance", "pattern": r"\bSUBR\b[\s\S]{0,200}?\bWVD\b"},
+                {"document": "Certificate of Insurance", "pattern": _POLICY_ROW},
+            ],
+            # A policy row with both ADDL INSD and SUBR WVD marks where SUBR WVD is Y/X;
+            # the printed "IF SUBROGATION IS WAIVED" form text is deliberately not matched
+            "pattern": rf"(?<!\S)[YNX][\s|]+[YX][\s|]+{_POLICY_ROW}",
+            "condition": "absent",
+            "inconclusive_if": [
+                {
+                    "document": "Certificate of Insurance",
+                    "pattern": rf"{_WAIVER_WORDING}|(?<!if\s)subrogation\s+(?:is\s+)?waived",
+                    "reason": "the COI text mentions a waiver of subrogation",
+                },
+                {
+                    "document": "Certificate of Insurance",
+                    # A lone Y/X before the policy number may be ADDL INSD rather than SUBR WVD
+                    "pattern": rf"(?<![\s|][YNX][\s|])(?<!\S)[YX][\s|]+{_POLICY_ROW}",
+                    "reason": "a policy row has a single Y/X mark that may be ADDL INSD or SUBR WVD",
+                },
+            ],
+            "decisive": True,
+            "verdict": "NON-COMPLIANT",
+            "risk_score": 5,
+            "fact": "Contract requires a waiver of subrogation but no policy on the COI has SUBR WVD marked",
+        },
+    ],
+    "kinetic": [
+        {
+            "name": "no_safety_program_keywords",
+            "type": "regex",
+            "pattern": (
+                r"\b(?:osha|ppe|personal\s+protective|hazard\s+communication|hazcom|lockout|tagout|loto|"
+                r"fall\s+protection|confined\s+space|emergency\s+action|incident\s+report\w*|"
+                r"safety\s+(?:program|policy|manual|training|plan))\b"
+            ),
+            "condition": "absent",
+            "decisive": True,
+            "verdict": "NON-COMPLIANT",
+            "fact": "None of the safety program keywords (OSHA, PPE, HazCom, LOTO, fall protection, ...) were found",
+        },
+    ],
+    "riskguru": [
+        {
+            "name": "emr_above_threshold",
+            "type": "number",
+            "pattern": _EMR,
+            "group": 1,
+            # The first stated EMR is the current one; older years in a history table do not count
+            "aggregate": "first",
+            "condition": ">",
+            "threshold": 1.5,
+            "decisive": True,
+            "verdict": "Overall Risk Rating: High / Recommendation: Do not proceed",
+            "fact": "Current EMR stated in the document: {value}",
+        },
+    ],
+    "prequaligy": [
+        {
+            "name": "emr_above_threshold",
+            "type": "number",
+            "pattern": _EMR,
+            "group": 1,
+            # The first stated EMR is the current one; older years in a history table do not count
+            "aggregate": "first",
+            "condition": ">",
+            "threshold": 1.5,
+            "decisive": True,
+            "verdict": "Overall Prequalification Status: Not Qualified",
+            "fact": "Current EMR stated in the document: {value}",
+        },
+    ],
+}
+
+_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d")
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.;!?])\s+|\n\s*\n")
+
+_COMPARATORS = {
+    ">": lambda value, threshold: value > threshold,
+    ">=": lambda value, threshold: value >= threshold,
+    "<": lambda value, threshold: value < threshold,
+    "<=": lambda value, threshold: value <= threshold,
+}
+
+
+def _parse_date(value: str) -> Optional[datetime.date]:
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class Rule:
+    """
+    A single deterministic check over extracted document text.
+    """
+
+    def __init__(self, definition: Dict):
+        """
+        Args:
+            definition (Dict): Rule definition (see DEFAULT_RULES for the supported keys).
+
+        Raises:
+            RuleConfigError: If the definition is missing keys or uses an unknown type/condition.
+        """
+        try:
+            self.name = definition["name"]
+            self.type = definition["type"]
+            self.pattern = re.compile(definition["pattern"], re.IGNORECASE)
+            self.condition = definition["condition"]
+        except KeyError as e:
+            raise RuleConfigError(f"Rule is missing required key {e}: {definition}")
+        except re.error as e:
+            raise RuleConfigError(f"Rule `{definition.get('name')}` has an invalid pattern: {e}")
+
+        self.document = definition.get("document")
+        self.group = definition.get("group", 0)
+        self.aggregate = definition.get("aggregate", "first")
+        self.threshold = definition.get("threshold")
+        self.value_pattern = re.compile(definition.get("value_pattern", r"\d[\d,]*(?:\.\d+)?"))
+        self.decisive = definition.get("decisive", False)
+        self.verdict = definition.get("verdict")
+        self.risk_score = definition.get("risk_score")
+        self.fact = definition.get("fact", f"{self.name}: {{value}}")
+
+        requires = definition.get("requires") or []
+        if isinstance(requires, dict):
+            requires = [requires]
+        try:
+            self.requires = [
+                (
+                    condition.get("document"),
+                    re.compile(condition["pattern"], re.IGNORECASE),
+                    re.compile(condition["unless"], re.IGNORECASE) if condition.get("unless") else None,
+                )
+                for condition in requires
+            ]
+            self.inconclusive_if = [
+                (
+                    condition.get("document"),
+                    re.compile(condition["pattern"], re.IGNORECASE),
+                    condition.get("reason", "the local check is inconclusive"),
+                )
+                for condition in definition.get("inconclusive_if") or []
+            ]
+        except (KeyError, AttributeError, re.error) as e:
+            raise RuleConfigError(f"Rule `{self.name}` has an invalid `requires`/`inconclusive_if` condition: {e}")
+
+        valid_conditions = {
+            "regex": {"present", "absent"},
+            "date": {"before_today", "after_today"},
+            "number": set(_COMPARATORS),
+        }
+        if self.type not in valid_conditions:
+            raise RuleConfigError(f"Rule `{self.name}` has unknown type: {self.type}")
+        if self.condition not in valid_conditions[self.type]:
+            raise RuleConfigError(f"Rule `{self.name}` has invalid condition for {self.type}: {self.condition}")
+        if self.type == "number" and self.threshold is None:
+            raise RuleConfigError(f"Rule `{self.name}` needs a numeric threshold.")
+        if self.aggregate not in {"min", "max", "first"}:
+            raise RuleConfigError(f"Rule `{self.name}` has unknown aggregate: {self.aggregate}")
+
+    @staticmethod
+    def _text_for(documents: Dict[str, str], document: Optional[str]) -> str:
+        return documents.get(document, "") if document else "\n".join(documents.values())
+
+    @staticmethod
+    def _requirement_met(text: str, pattern, unless) -> bool:
+        if unless is None:
+            return pattern.search(text) is not None
+        return any(
+            pattern.search(sentence) and not unless.search(sentence)
+            for sentence in _SENTENCE_SPLIT_RE.split(text)
+        )
+
+    def _inconclusive_reason(self, documents: Dict[str, str]) -> Optional[str]:
+        for document, pattern, reason in self.inconclusive_if:
+            if pattern.search(self._text_for(documents, document)):
+                return reason
+        return None
+
+    def _select(self, values: list):
+        if not values:
+            return None
+        if self.aggregate == "min":
+            return min(values)
+        if self.aggregate == "max":
+            return max(values)
+        return values[0]
+
+    def evaluate(self, documents: Dict[str, str], today: datetime.date) -> Optional[Dict]:
+        """
+        Applies the rule to the documents.
+
+        Args:
+            documents (Dict[str, str]): Extracted text per document label.
+            today (datetime.date): Reference date for date rules.
+
+        Returns:
+            Optional[Dict]: {"rule", "fired", "inconclusive", "fact"} or None when the rule does not
+            apply (precondition not met, or nothing could be extracted).
+        """
+        for required_document, required_pattern, unless in self.requires:
+            if not self._requirement_met(self._text_for(documents, required_document), required_pattern, unless):
+                return None
+
+        if self.document:
+            if self.document not in documents:
+                return None
+            text = documents[self.document]
+        else:
+            text = "\n".join(documents.values())
+
+        if self.type == "regex":
+            present = self.pattern.search(text) is not None
+            fired = present if self.condition == "present" else not present
+            return self._outcome(documents, fired, self.fact.format(value="") if fired else None)
+
+        matches = [m.group(self.group) for m in self.pattern.finditer(text)]
+
+        if self.type == "date":
+            value = self._select([d for d in map(_parse_date, matches) if d is not None])
+            if value is None:
+                return None
+            fired = value < today if self.condition == "before_today" else value > today
+            display = value.isoformat()
+        else:
+            numbers = []
+            for match in matches:
+                for number in self.value_pattern.findall(match or ""):
+                    try:
+                        numbers.append(float(number.replace(",", "")))
+                    except ValueError:
+                        continue
+            value = self._select(numbers)
+            if value is None:
+                return None
+            fired = _COMPARATORS[self.condition](value, float(self.threshold))
+            display = f"{value:g}"
+
+        return self._outcome(documents, fired, self.fact.format(value=display))
+
+    def _outcome(self, documents: Dict[str, str], fired: bool, fact: Optional[str]) -> Dict:
+        reason = self._inconclusive_reason(documents) if fired else None
+        if reason:
+            fact = f"{fact} (not conclusive: {reason})"
+        return {"rule": self.name, "fired": fired, "inconclusive": bool(reason), "fact": fact}
+
+
+class PrescreenResult:
+    """
+    Outcome of running an agent's rules over its extracted text.
+    """
+
+    def __init__(self, agent_name: str, outcomes: List[Dict], rules: Dict[str, Rule]):
+        self.agent_name = agent_name
+        self.outcomes = outcomes
+        self._rules = rules
+
+    @property
+    def triggered(self) -> List[Dict]:
+        """Rules whose condition was met."""
+        return [o for o in self.outcomes if o["fired"]]
+
+    @property
+    def decisive(self) -> List[Dict]:
+        """Triggered rules that settle the verdict without an LLM call."""
+        return [o for o in self.triggered if self._rules[o["rule"]].decisive and not o["inconclusive"]]
+
+    @property
+    def is_decisive(self) -> bool:
+        return bool(self.decisive)
+
+    @property
+    def facts(self) -> List[str]:
+        return [o["fact"] for o in self.outcomes if o["fact"]]
+
+    @property
+    def verdict(self) -> Optional[str]:
+        """Verdict of the first decisive rule, or None when the pre-screen is not decisive."""
+        if not self.is_decisive:
+            return None
+        return self._rules[self.decisive[0]["rule"]].verdict or "NOT ACCEPTABLE"
+
+    @property
+    def risk_score(self) -> Optional[int]:
+        """Risk score of the first decisive rule, if it defines one."""
+        if not self.is_decisive:
+            return None
+        return self._rules[self.decisive[0]["rule"]].risk_score
+
+    def report(self) -> str:
+        """
+        Formats the fast verdict returned instead of an LLM response for clear-cut cases.
+
+        Returns:
+            str: Structured pre-screen report.
+        """
+        lines = [
+            "**⚡ Rule Pre-Screen Report** (decided locally, no LLM call)",
+            "- Triggered Rules:",
+        ]
+        lines.extend(f"    - {o['rule']}: {o['fact']}" for o in self.triggered)
+
+        other_facts = [o["fact"] for o in self.outcomes if o["fact"] and not o["fired"]]
+        if other_facts:
+            lines.append("- Other Extracted Facts:")
+            lines.extend(f"    - {fact}" for fact in other_facts)
+
+        lines.append(f"- ✅ Final Verdict: {self.verdict}")
+        return "\n".join(lines)
+
+    def annotate_prompt(self, prompt: str) -> str:
+        """
+        Prepends the pre-computed facts to the agent prompt so the model does not re-derive them.
+
+        Args:
+            prompt (str): Prompt returned by the agent's `_build_prompt`.
+
+        Returns:
+            str: Prompt with the facts block, or the prompt unchanged when there are no facts.
+        """
+        if not self.facts:
+            return prompt
+        facts = "\n".join(f"- {fact}" for fact in self.facts)
+        return (
+            "Pre-verified facts (extracted deterministically from the document text; "
+            "use them as given instead of re-deriving them):\n"
+            f"{facts}\n\n"
+            f"{prompt}"
+        )
+
+
+class RuleEngine:
+    """
+    Runs configurable per-agent rules over extracted text before `_build_prompt`.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, List[Dict]]] = None):
+        """
+        Args:
+            rules (Dict[str, List[Dict]], optional): Rule definitions per agent name
+                (default: DEFAULT_RULES).
+
+        Raises:
+            RuleConfigError: If any rule definition is invalid.
+        """
+        definitions = DEFAULT_RULES if rules is None else rules
+        self.rules: Dict[str, Dict[str, Rule]] = {
+            agent: {rule.name: rule for rule in map(Rule, agent_rules)}
+            for agent, agent_rules in definitions.items()
+        }
+
+    def evaluate(self, agent_name: str, documents: Dict[str, str], today: Optional[datetime.date] = None) -> PrescreenResult:
+        """
+        Evaluates all rules configured for the agent.
+
+        Args:
+            agent_name (str): Registered agent name.
+            documents (Dict[str, str]): Extracted text per document label.
+            today (datetime.date, optional): Reference date for date rules (default: today).
+
+        Returns:
+            PrescreenResult: Triggered rules and extracted facts.
+        """
+        today = today or datetime.date.today()
+        rules = self.rules.get(agent_name, {})
+        outcomes = []
+        for rule in rules.values():
+            try:
+                outcome = rule.evaluate(documents, today)
+            except Exception as e:
+                print(f"[WARN] Pre-screen rule `{rule.name}` failed: {e}")
+                continue
+            if outcome is not None:
+                outcomes.append(outcome)
+        return PrescreenResult(agent_name, outcomes, rules)
+
+
+def load_rules(path: str) -> Dict[str, List[Dict]]:
+    """
+    Loads rule definitions from a JSON file and merges them over DEFAULT_RULES.
+
+    Agents listed in the file replace their default rules entirely; an empty list disables
+    pre-screening for that agent.
+
+    Args:
+        path (str): Path to a JSON file mapping agent names to lists of rule definitions.
+
+    Returns:
+        Dict[str, List[Dict]]: Merged rule definitions.
+
+    Raises:
+        RuleConfigError: If the file cannot be read or is not a JSON object.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except Exception as e:
+        raise RuleConfigError(f"Failed to load rules from {path}: {e}")
+
+    if not isinstance(overrides, dict):
+        raise RuleConfigError(f"Rules file must contain a JSON object keyed by agent name: {path}")
+
+    merged = dict(DEFAULT_RULES)
+    merged.update(overrides)
+    return merged
+
+
+_engine_lock = threading.Lock()
+_engine: Optional[RuleEngine] = None
+
+
+def get_rule_engine() -> RuleEngine:
+    """
+    Returns the process-wide rule engine, built once from DEFAULT_RULES and the optional
+    JSON overrides named by the INJALA_RULES_FILE environment variable.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                path = os.environ.get(RULES_FILE_ENV)
+                _engine = RuleEngine(load_rules(path) if path else None)
+    return _engine
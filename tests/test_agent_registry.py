@@ -0,0 +1,100 @@
+# tests/test_agent_registry.py
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import agent_registry
+import bench_startup
+from agent_registry import AgentRegistryError
+
+
+class _Model:
+    def generate_content(self, prompt):
+        return types.SimpleNamespace(text="ok")
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    # Each test works on a copy of the registry
+    monkeypatch.setattr(agent_registry, "_REGISTRY", dict(agent_registry._REGISTRY))
+    return agent_registry._REGISTRY
+
+
+def test_create_agent_imports_module_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "lazy_test_agent.py").write_text(
+        "class LazyAgent:\n"
+        "    def __init__(self, model):\n"
+        "        self.model = model\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_test_agent", raising=False)
+
+    agent_registry.register_agent("lazy", "lazy_test_agent:LazyAgent")
+    assert agent_registry.get_file_count("lazy") == 1
+    assert "lazy_test_agent" not in sys.modules
+
+    model = _Model()
+    agent = agent_registry.create_agent("lazy", model)
+    assert "lazy_test_agent" in sys.modules
+    assert agent.model is model
+    assert agent_registry._REGISTRY["lazy"]["target"] is type(agent)
+
+
+def test_register_agent_as_decorator():
+    @agent_registry.register_agent("decorated", file_count=2, description="Decorated agent", roles=["contract", "acord_coi"])
+    class DecoratedAgent:
+        def __init__(self, model):
+            self.model = model
+
+    assert DecoratedAgent.__name__ == "DecoratedAgent"
+    assert agent_registry.get_description("decorated") == "Decorated agent"
+    assert agent_registry.get_file_roles("decorated") == ["contract", "acord_coi"]
+    assert isinstance(agent_registry.create_agent("decorated", _Model()), DecoratedAgent)
+
+
+def test_unknown_or_broken_agents_raise():
+    with pytest.raises(AgentRegistryError):
+        agent_registry.get_agent_class("does-not-exist")
+    with pytest.raises(AgentRegistryError):
+        agent_registry.register_agent("bad", "no_colon")
+
+    agent_registry.register_agent("broken", "module_that_does_not_exist:Agent")
+    with pytest.raises(AgentRegistryError):
+        agent_registry.get_agent_class("broken")
+
+
+def test_entry_points_registered_before_other_threads_see_them(monkeypatch):
+    import importlib.metadata
+
+    def slow_entry_points(group=None):
+        # Widen the window between the loader starting and the plugin being registered
+        time.sleep(0.05)
+        return [types.SimpleNamespace(name="plugin", value="plugin_module:PluginAgent")]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", slow_entry_points)
+    monkeypatch.setattr(agent_registry, "_entry_points_loaded", False)
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def lookup():
+        barrier.wait()
+        results.append(agent_registry.is_registered("plugin"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+
+
+def test_startup_stays_within_budget_without_heavy_imports():
+    stats = bench_startup.measure_startup(runs=3)
+    assert stats["loaded"] == []
+    assert stats["median_ms"] <= bench_startup.DEFAULT_BUDGET_MS
@@ -0,0 +1,206 @@
+# tests/test_api_server.py
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+import api_server
+from auto_router import classify_document
+from text_normalizer import normalize_pages
+
+SAFETY_MANUAL = b"Company Safety Program: OSHA training, PPE and fall protection."
+
+
+@pytest.fixture(autouse=True)
+def fake_ocr(monkeypatch):
+    # Uploads are plain text standing in for PDFs; OCR and fingerprinting just decode them
+    monkeypatch.setattr(api_server, "extract_normalized_text_from_pdf", lambda data: normalize_pages([data.decode()]))
+    monkeypatch.setattr(api_server, "fingerprint_files", lambda files: [classify_document(f.decode()) for f in files])
+
+
+def _run(model, scenario, **options):
+    async def _main():
+        options.setdefault("ocr_executor", ThreadPoolExecutor(max_workers=2))
+        async with TestClient(TestServer(api_server.create_app(model, **options))) as client:
+            return await scenario(client)
+
+    return asyncio.run(_main())
+
+
+def _upload(*files, query=None):
+    form = FormData()
+    if query is not None:
+        form.add_field("query", query)
+    for idx, data in enumerate(files):
+        form.add_field("files", data, filename=f"file{idx}.pdf", content_type="application/pdf")
+    return form
+
+
+def test_health_and_metrics():
+    async def scenario(client):
+        assert (await (await client.get("/health")).json()) == {"status": "ok"}
+        await client.post("/agents/kinetic", data=_upload(SAFETY_MANUAL))
+        return await (await client.get("/metrics")).json()
+
+    metrics = _run(api_server.FakeModel(), scenario)
+    assert metrics["requests"]["GET /health"] == 1
+    assert metrics["llm"]["count"] == 1
+    assert metrics["ocr"]["count"] == 1
+    assert metrics["ocr_normalization"]["documents"] >= 1
+
+
+def test_route_assigns_files_by_role():
+    async def scenario(client):
+        files = (SAFETY_MANUAL, b"Lorem ipsum", b"Balance sheet and financial statements")
+        response = await client.post("/route", data=_upload(*files, query="Review safety"))
+        return response.status, await response.json()
+
+    status, body = _run(api_server.FakeModel(), scenario)
+    assert status == 200
+    assert body["agent"] == "kinetic"
+    assert body["roles"] == ["safety_manual", "unknown", "financials"]
+    assert body["runs"] == [[0], [1]]
+    assert body["unassigned"] == [2]
+
+
+def test_route_requires_query():
+    async def scenario(client):
+        return (await client.post("/route", data=_upload(SAFETY_MANUAL))).status
+
+    assert _run(api_server.FakeModel(), scenario) == 400
+
+
+def test_run_agent_sync():
+    model = api_server.FakeModel()
+
+    async def scenario(client):
+        response = await client.post("/agents/kinetic", data=_upload(SAFETY_MANUAL))
+        return response.status, await response.json()
+
+    status, job = _run(model, scenario)
+    assert status == 200
+    assert job["status"] == "done"
+    assert job["result"] == model.text
+    assert model.calls == 1
+
+
+def test_run_agent_checks_file_count_and_name():
+    async def scenario(client):
+        wrong_count = await client.post("/agents/asuretify", data=_upload(SAFETY_MANUAL))
+        unknown = await client.post("/agents/nope", data=_upload(SAFETY_MANUAL))
+        return wrong_count.status, unknown.status
+
+    assert _run(api_server.FakeModel(), scenario) == (400, 404)
+
+
+def test_run_agent_async_job():
+    async def scenario(client):
+        response = await client.post("/agents/kinetic?async=1", data=_upload(SAFETY_MANUAL))
+        accepted = await response.json()
+        assert response.status == 202
+        for _ in range(100):
+            job = await (await client.get(f"/jobs/{accepted['job_id']}")).json()
+            if job["status"] == "done":
+                return job
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"Job did not finish: {job}")
+
+    assert _run(api_server.FakeModel(), scenario)["result"]
+
+
+def test_run_agent_timeout_returns_job_id():
+    async def scenario(client):
+        response = await client.post("/agents/kinetic", data=_upload(SAFETY_MANUAL))
+        body = await response.json()
+        assert response.status == 504
+        for _ in range(100):
+            job = await (await client.get(f"/jobs/{body['job_id']}")).json()
+            if job["status"] == "done":
+                return job
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"Job did not finish after the timeout: {job}")
+
+    job = _run(api_server.FakeModel(delay=0.3), scenario, request_timeout=0.05)
+    assert job["result"]
+
+
+def test_pending_job_limit_rejects_new_runs():
+    async def scenario(client):
+        first = await client.post("/agents/kinetic?async=1", data=_upload(SAFETY_MANUAL))
+        second = await client.post("/agents/kinetic?async=1", data=_upload(SAFETY_MANUAL))
+        metrics = await (await client.get("/metrics")).json()
+        return first.status, second.status, metrics["rejected"]
+
+    assert _run(api_server.FakeModel(delay=0.3), scenario, max_pending_jobs=1) == (202, 503, 1)
+
+
+def test_cleanup_leaves_caller_executor_running():
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    async def scenario(client):
+        return (await client.get("/health")).status
+
+    assert _run(api_server.FakeModel(), scenario, ocr_executor=executor) == 200
+    assert executor.submit(lambda: "still running").result() == "still running"
+    executor.shutdown()
+
+
+def test_route_timeout_covers_fingerprinting(monkeypatch):
+    def slow_fingerprint(files):
+        import time
+        time.sleep(0.3)
+        return ["safety_manual"]
+
+    monkeypatch.setattr(api_server, "fingerprint_files", slow_fingerprint)
+
+    async def scenario(client):
+        return (await client.post("/route", data=_upload(SAFETY_MANUAL, query="Review safety"))).status
+
+    assert _run(api_server.FakeModel(), scenario, request_timeout=0.05) == 504
+
+
+def test_asuretify_bulk_streams_ndjson_rows(monkeypatch):
+    def extract(data):
+        if data == b"unreadable":
+            raise RuntimeError("OCR did not extract any text from the images.")
+        return normalize_pages([data.decode()])
+
+    monkeypatch.setattr(api_server, "extract_normalized_text_from_pdf", extract)
+    model = api_server.FakeModel()
+    files = (
+        b"Subcontractor shall maintain General Liability insurance.",
+        b"A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2099",
+        b"A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2020 01/01/2021",
+        b"unreadable",
+    )
+
+    async def scenario(client):
+        response = await client.post("/agents/asuretify/bulk", data=_upload(*files))
+        assert response.headers["Content-Type"].startswith("application/x-ndjson")
+        return response.status, [json.loads(line) for line in (await response.text()).splitlines()]
+
+    status, lines = _run(model, scenario)
+    assert status == 200
+    assert lines[0] == {"requirements": model.text}
+
+    rows = {row["index"]: row for row in lines[1:]}
+    assert sorted(rows) == [0, 1, 2]
+    assert rows[0]["verdict"] == "COMPLIANT" and rows[0]["source"] == "llm"
+    assert rows[1]["verdict"] == "NON-COMPLIANT" and rows[1]["source"] == "rules"
+    assert rows[2]["verdict"] == "ERROR" and "OCR" in rows[2]["error"]
+    # One requirement extraction plus one check for the readable, unexpired COI
+    assert model.calls == 2
+
+
+def test_asuretify_bulk_needs_contract_and_coi():
+    async def scenario(client):
+        return (await client.post("/agents/asuretify/bulk", data=_upload(b"contract only"))).status
+
+    assert _run(api_server.FakeModel(), scenario) == 400
@@ -0,0 +1,118 @@
+# tests/test_asuretify.py
+
+import threading
+
+import pytest
+
+import asuretify
+from asuretify import AsuretifyAgent, format_compliance_table
+from ocr_utils import OCRProcessingError
+
+CONTRACT = "Subcontractor shall maintain General Liability of $1,000,000 per occurrence."
+REQUIREMENTS = "- General Liability: $1,000,000 per occurrence\n- Waiver of Subrogation: Not required"
+VALID_COI = "A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2099"
+EXPIRED_COI = "A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2020 01/01/2021"
+LLM_ROW = "- Gaps: None\n- Risk Score (1-5): 2\n- ✅ Final Verdict: COMPLIANT"
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    """Answers the requirement-extraction prompt and the per-COI prompt with canned text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requirement_calls = 0
+        self.coi_calls = 0
+
+    def generate_content(self, prompt):
+        with self._lock:
+            if "Extract ONLY the insurance requirements" in prompt:
+                self.requirement_calls += 1
+                return _Response(REQUIREMENTS)
+            self.coi_calls += 1
+            return _Response(LLM_ROW)
+
+
+@pytest.fixture(autouse=True)
+def fake_ocr(monkeypatch):
+    # "PDFs" are plain text; b"unreadable" stands in for a COI whose OCR fails
+    def extract_text(data):
+        if data == b"unreadable":
+            raise OCRProcessingError("OCR did not extract any text from the images.")
+        return data.decode()
+
+    monkeypatch.setattr(asuretify, "extract_text_from_pdf", extract_text)
+
+
+def _run_bulk(model, cois, **kwargs):
+    agent = AsuretifyAgent(model)
+    rows = list(agent.run_bulk(CONTRACT.encode(), [c.encode() for c in cois], **kwargs))
+    return agent, rows
+
+
+def test_requirements_extracted_once_for_many_cois():
+    model = _Model()
+    _, rows = _run_bulk(model, [VALID_COI] * 5)
+    assert model.requirement_calls == 1
+    assert model.coi_calls == 5
+    assert sorted(row["index"] for row in rows) == [0, 1, 2, 3, 4]
+
+
+def test_rows_carry_their_coi_index():
+    _, rows = _run_bulk(_Model(), [VALID_COI, EXPIRED_COI, VALID_COI])
+    by_index = {row["index"]: row for row in rows}
+    assert by_index[0]["verdict"] == by_index[2]["verdict"] == "COMPLIANT"
+    assert by_index[0]["risk_score"] == 2 and by_index[0]["source"] == "llm"
+    assert by_index[1]["verdict"] == "NON-COMPLIANT"
+
+
+def test_unreadable_coi_becomes_error_row():
+    _, rows = _run_bulk(_Model(), [VALID_COI, "unreadable"])
+    error_row = next(row for row in rows if row["index"] == 1)
+    assert error_row["verdict"] == "ERROR"
+    assert "OCR" in error_row["error"]
+    assert next(row for row in rows if row["index"] == 0)["error"] is None
+
+
+def test_rule_verdicts_skip_the_model():
+    model = _Model()
+    row = AsuretifyAgent(model).check_coi(REQUIREMENTS, EXPIRED_COI)
+    assert row == {
+        "verdict": "NON-COMPLIANT",
+        "risk_score": 5,
+        "gaps": "Earliest policy expiration date on the COI: 2021-01-01",
+        "source": "rules",
+    }
+    assert model.coi_calls == 0
+
+
+def test_requirement_set_does_not_trigger_contract_rules():
+    # "Waiver of Subrogation: Not required" must not fail a COI without a waiver
+    coi = "INSR ADDL SUBR\nLTR TYPE INSD WVD POLICY\n" + VALID_COI
+    row = AsuretifyAgent(_Model()).check_coi(REQUIREMENTS, coi)
+    assert row["source"] == "llm"
+    assert row["verdict"] == "COMPLIANT"
+
+
+def test_document_texts_labelled_by_coi_names():
+    agent, _ = _run_bulk(_Model(), [VALID_COI, EXPIRED_COI, "unreadable"], coi_names=["a.pdf", "b.pdf", "c.pdf"])
+    assert agent.document_texts == {
+        "Contract": CONTRACT,
+        "Contract Insurance Requirements": REQUIREMENTS,
+        "Certificate of Insurance (a.pdf)": VALID_COI,
+        "Certificate of Insurance (b.pdf)": EXPIRED_COI,
+    }
+
+
+def test_format_compliance_table_orders_rows_and_escapes_gaps():
+    rows = [
+        {"index": 1, "verdict": "ERROR", "risk_score": None, "gaps": "", "source": None, "error": "bad | pdf"},
+        {"index": 0, "verdict": "COMPLIANT", "risk_score": 2, "gaps": "None", "source": "llm", "error": None},
+    ]
+    table = format_compliance_table(rows, ["a.pdf", "b.pdf"]).splitlines()
+    assert table[2] == "| 1 | a.pdf | COMPLIANT | 2 | None |"
+    assert table[3] == "| 2 | b.pdf | ERROR | – | bad / pdf |"
@@ -0,0 +1,42 @@
+# tests/test_auto_router.py
+
+import pytest
+
+from auto_router import UNKNOWN_ROLE, assign_files, classify_document, unassigned_files
+
+
+def test_classify_document():
+    assert classify_document("ACORD CERTIFICATE OF LIABILITY INSURANCE ... CERTIFICATE HOLDER") == "acord_coi"
+    assert classify_document("This Subcontract Agreement, hereinafter ... WHEREAS") == "contract"
+    assert classify_document("Lorem ipsum") == UNKNOWN_ROLE
+
+
+@pytest.mark.parametrize("roles, runs", [
+    (["contract", "acord_coi"], [[0, 1]]),
+    (["acord_coi", "contract", "acord_coi"], [[1, 0], [1, 2]]),
+    (["contract", UNKNOWN_ROLE], [[0, 1]]),
+    ([UNKNOWN_ROLE, "acord_coi"], [[0, 1]]),
+    (["contract", UNKNOWN_ROLE, UNKNOWN_ROLE], [[0, 1], [0, 2]]),
+    (["contract", "acord_coi", UNKNOWN_ROLE], [[0, 1], [0, 2]]),
+    (["contract", "contract", "acord_coi"], [[0, 2]]),
+    ([UNKNOWN_ROLE, UNKNOWN_ROLE], []),
+    (["safety_manual", "financials"], []),
+])
+def test_assign_files_asuretify(roles, runs):
+    assert assign_files("asuretify", roles) == runs
+
+
+@pytest.mark.parametrize("roles, unassigned", [
+    (["contract", UNKNOWN_ROLE, UNKNOWN_ROLE], []),
+    (["contract", "acord_coi", UNKNOWN_ROLE], []),
+    (["contract", "contract", "acord_coi"], [1]),
+    (["contract", "acord_coi", "safety_manual"], [2]),
+])
+def test_unassigned_files_are_reported(roles, unassigned):
+    assert unassigned_files(assign_files("asuretify", roles), len(roles)) == unassigned
+
+
+def test_assign_files_single_file_agent():
+    assert assign_files("kinetic", ["financials", "safety_manual"]) == [[1]]
+    assert assign_files("kinetic", [UNKNOWN_ROLE]) == []
+    assert assign_files("not-an-agent", ["contract"]) == []
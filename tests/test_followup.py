@@ -0,0 +1,155 @@
+# tests/test_followup.py
+
+import sys
+import types
+
+import pytest
+
+from followup import DocumentChunkIndex, FollowUpError, FollowUpSession
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    def __init__(self, model_name=None, text="answer"):
+        self.model_name = model_name
+        self.text = text
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return _Response(self.text)
+
+
+class _Cache:
+    def __init__(self):
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """Stands in for google.generativeai so context caching can be exercised offline."""
+    calls = {"create": 0, "fail": False}
+    cached_model = _Model(text="cached answer")
+
+    def create(**kwargs):
+        calls["create"] += 1
+        if calls["fail"]:
+            raise RuntimeError("content is below the cache token minimum")
+        calls["cache"] = _Cache()
+        return calls["cache"]
+
+    caching = types.SimpleNamespace(CachedContent=types.SimpleNamespace(create=create))
+    genai = types.ModuleType("google.generativeai")
+    genai.caching = caching
+    genai.GenerativeModel = types.SimpleNamespace(from_cached_content=lambda cached_content: cached_model)
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    monkeypatch.setitem(sys.modules, "google.generativeai.caching", caching)
+    calls["cached_model"] = cached_model
+    return calls
+
+
+DOCUMENTS = {
+    "Contract": "General liability limits are $1,000,000 per occurrence.\n" + "Filler clause text. " * 100,
+    "Certificate of Insurance": "Umbrella limits are $5,000,000 each occurrence.\n" + "Producer details. " * 100,
+}
+
+
+def test_split_empty_text():
+    assert DocumentChunkIndex._split("   ", 100, 20) == []
+
+
+def test_split_chunks_overlap_on_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(200))
+    chunks = DocumentChunkIndex._split(text, 100, 30)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    words = set(text.split())
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[0] in words
+        assert current.split()[0] in previous.split()
+
+
+def test_search_ranks_relevant_chunk():
+    index = DocumentChunkIndex(DOCUMENTS, chunk_size=300, overlap=50)
+    label, chunk = index.search("umbrella limits", top_k=1)[0]
+    assert label == "Certificate of Insurance"
+    assert "$5,000,000" in chunk
+
+
+def test_search_returns_document_order_and_falls_back_without_terms():
+    index = DocumentChunkIndex(DOCUMENTS, chunk_size=300, overlap=50)
+    results = index.search("limits occurrence", top_k=3)
+    assert results == [c for c in index.chunks if c in results]
+    assert index.search("the and of", top_k=2) == index.chunks[:2]
+
+
+def test_cache_created_lazily_on_first_question(fake_genai):
+    session = FollowUpSession(_Model(model_name="gemini-test"), "asuretify", DOCUMENTS, "report")
+    assert fake_genai["create"] == 0
+    assert session.mode == "pending"
+
+    assert session.ask("What are the umbrella limits?") == "cached answer"
+    session.ask("And the GL limits?")
+    assert fake_genai["create"] == 1
+    assert session.mode == "cache"
+    assert "Follow-up question: And the GL limits?" in fake_genai["cached_model"].prompts[-1]
+
+
+def test_falls_back_to_retrieval_when_cache_creation_fails(fake_genai):
+    fake_genai["fail"] = True
+    model = _Model(model_name="gemini-test")
+    session = FollowUpSession(model, "asuretify", DOCUMENTS, "report")
+
+    assert session.ask("What are the umbrella limits?") == "answer"
+    assert session.mode == "retrieval"
+    assert "$5,000,000" in model.prompts[-1]
+    assert "RELEVANT DOCUMENT PASSAGES" in model.prompts[-1]
+
+
+def test_history_is_trimmed():
+    model = _Model()
+    session = FollowUpSession(model, "kinetic", DOCUMENTS, "report", max_history=2)
+    for question in ("first question", "second question", "third question", "fourth question"):
+        session.ask(question)
+
+    prompt = model.prompts[-1]
+    assert "Q: first question" not in prompt
+    assert "Q: second question" in prompt and "Q: third question" in prompt
+    assert len(session.history) == 4
+
+
+def test_close_deletes_cache_and_keeps_answering(fake_genai):
+    model = _Model(model_name="gemini-test")
+    session = FollowUpSession(model, "asuretify", DOCUMENTS, "report")
+    session.ask("What are the umbrella limits?")
+
+    session.close()
+    assert fake_genai["cache"].deleted
+    assert session.mode == "retrieval"
+    assert session.ask("What are the umbrella limits?") == "answer"
+    assert fake_genai["create"] == 1
+
+
+def test_close_before_first_question_never_creates_cache(fake_genai):
+    session = FollowUpSession(_Model(model_name="gemini-test"), "kinetic", DOCUMENTS, "report")
+    session.close()
+    assert session.ask("What are the umbrella limits?") == "answer"
+    assert fake_genai["create"] == 0
+    assert session.mode == "retrieval"
+
+
+def test_invalid_input():
+    with pytest.raises(FollowUpError):
+        FollowUpSession(_Model(), "kinetic", {}, "report")
+    with pytest.raises(FollowUpError):
+        FollowUpSession(_Model(), "kinetic", DOCUMENTS, "report").ask("  ")
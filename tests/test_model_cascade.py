@@ -0,0 +1,82 @@
+# tests/test_model_cascade.py
+
+import pytest
+
+from model_utils import CascadeModel, ModelCascade, bind_model
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Tier:
+    def __init__(self, name, text=None, error=None):
+        self.model_name = name
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return _Response(self.text)
+
+
+VALID = "Risk Score: 2\nFinal Verdict: COMPLIANT"
+
+
+def test_first_tier_answer_is_used_when_valid():
+    tiers = [_Tier("lite", VALID), _Tier("pro", VALID)]
+    cascade = ModelCascade(tiers)
+    assert cascade.generate("prompt", "asuretify").text == VALID
+    assert [t.calls for t in tiers] == [1, 0]
+    assert cascade.stats.snapshot()["escalation_rate"] == 0.0
+
+
+def test_schema_miss_escalates():
+    tiers = [_Tier("lite", "garbled"), _Tier("pro", VALID)]
+    cascade = ModelCascade(tiers)
+    assert cascade.generate("prompt", "asuretify").text == VALID
+    snapshot = cascade.stats.snapshot()
+    assert snapshot["escalations"] == {"schema": 1}
+    assert snapshot["tiers"]["pro"]["calls"] == 1
+
+
+def test_top_tier_error_returns_lower_tier_response():
+    tiers = [_Tier("lite", "garbled"), _Tier("pro", error=RuntimeError("quota"))]
+    assert ModelCascade(tiers).generate("prompt", "asuretify").text == "garbled"
+
+
+class _BlockedResponse:
+    @property
+    def text(self):
+        raise ValueError("response was blocked by safety filters")
+
+
+def test_blocked_top_tier_response_returns_lower_tier_response():
+    blocked = _Tier("pro")
+    blocked.generate_content = lambda prompt: _BlockedResponse()
+    tiers = [_Tier("lite", "missing sections"), blocked]
+    assert ModelCascade(tiers).generate("prompt", "asuretify").text == "missing sections"
+
+
+def test_error_without_any_response_is_raised():
+    with pytest.raises(RuntimeError):
+        ModelCascade([_Tier("lite", error=RuntimeError("down"))]).generate("prompt")
+
+
+def test_long_input_starts_one_tier_higher():
+    tiers = [_Tier("lite", VALID), _Tier("flash", VALID), _Tier("pro", VALID)]
+    cascade = ModelCascade(tiers, {"default": {"long_input_chars": 10}})
+    cascade.generate("x" * 11)
+    assert [t.calls for t in tiers] == [0, 1, 0]
+
+
+def test_bind_model_applies_agent_policy():
+    cascade = ModelCascade([_Tier("lite", VALID)])
+    bound = bind_model(cascade, "kinetic")
+    assert isinstance(bound, CascadeModel) and bound.agent_name == "kinetic"
+    plain = _Tier("plain")
+    assert bind_model(plain, "kinetic") is plain
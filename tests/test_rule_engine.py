@@ -0,0 +1,118 @@
+# tests/test_rule_engine.py
+
+import datetime
+
+import pytest
+
+from rule_engine import RuleConfigError, RuleEngine
+
+TODAY = datetime.date(2025, 6, 1)
+
+ACORD_HEADER = (
+    "INSR ADDL SUBR\n"
+    "LTR TYPE OF INSURANCE INSD WVD POLICY NUMBER POLICY EFF POLICY EXP LIMITS\n"
+)
+ACORD_BOILERPLATE = "IF SUBROGATION IS WAIVED, subject to the terms and conditions of the policy"
+WAIVER_CONTRACT = "Subcontractor shall provide a waiver of subrogation in favor of the Contractor."
+
+
+def _coi(row: str) -> str:
+    return f"{ACORD_HEADER}{row}\n{ACORD_BOILERPLATE}"
+
+
+def _asuretify(contract: str, coi: str):
+    return RuleEngine().evaluate("asuretify", {"Contract": contract, "Certificate of Insurance": coi}, TODAY)
+
+
+def test_expired_policy_is_decisive_with_rule_verdict_and_risk_score():
+    result = _asuretify("", _coi("A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2024 01/01/2025"))
+    assert result.is_decisive
+    assert result.verdict == "NON-COMPLIANT"
+    assert result.risk_score == 5
+    assert "2025-01-01" in result.report()
+
+
+@pytest.mark.parametrize("row", [
+    "A COMMERCIAL GENERAL LIABILITY Y Y CGL1 01/01/2025 01/01/2026",
+    "A COMMERCIAL GENERAL LIABILITY N X CGL1 01/01/2025 01/01/2026",
+    "A COMMERCIAL GENERAL LIABILITY | N | Y | CGL1 | 01/01/2025 | 01/01/2026",
+])
+def test_waiver_marked_in_subr_wvd_column(row):
+    assert not _asuretify(WAIVER_CONTRACT, _coi(row)).triggered
+
+
+@pytest.mark.parametrize("row", [
+    "A COMMERCIAL GENERAL LIABILITY Y N CGL1 01/01/2025 01/01/2026",
+    "A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2026",
+])
+def test_waiver_missing_ignores_printed_form_text(row):
+    result = _asuretify(WAIVER_CONTRACT, _coi(row))
+    assert [o["rule"] for o in result.triggered] == ["waiver_of_subrogation_missing"]
+    assert result.is_decisive
+
+
+@pytest.mark.parametrize("contract", [
+    "A waiver of subrogation is not required under this Agreement.",
+    "Subcontractor shall provide a waiver of subrogation if required by the Owner.",
+    "Policies shall include a waiver of subrogation to the extent applicable.",
+])
+def test_waiver_rule_skips_negated_or_conditional_contract_wording(contract):
+    result = _asuretify(contract, _coi("A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2026"))
+    assert "waiver_of_subrogation_missing" not in [o["rule"] for o in result.outcomes]
+    assert not result.is_decisive
+
+
+def test_waiver_rule_uses_affirmative_sentence_among_others():
+    contract = "No asbestos work is included. Subcontractor shall provide a waiver of subrogation."
+    result = _asuretify(contract, _coi("A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2026"))
+    assert result.is_decisive
+
+
+@pytest.mark.parametrize("row, reason", [
+    (
+        "A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2026\n"
+        "DESCRIPTION OF OPERATIONS: Waiver of subrogation applies in favor of the certificate holder.",
+        "the COI text mentions a waiver of subrogation",
+    ),
+    (
+        "A COMMERCIAL GENERAL LIABILITY | Y | CGL1 | 01/01/2025 | 01/01/2026",
+        "a policy row has a single Y/X mark that may be ADDL INSD or SUBR WVD",
+    ),
+])
+def test_waiver_rule_inconclusive_cases_become_facts(row, reason):
+    result = _asuretify(WAIVER_CONTRACT, _coi(row))
+    assert not result.is_decisive
+    assert result.verdict is None
+    assert [o["rule"] for o in result.triggered] == ["waiver_of_subrogation_missing"]
+    fact = result.triggered[0]["fact"]
+    assert reason in fact
+    assert fact in result.annotate_prompt("PROMPT")
+
+
+def test_waiver_rule_needs_contract_requirement_and_policy_table():
+    row = "A COMMERCIAL GENERAL LIABILITY CGL1 01/01/2025 01/01/2026"
+    assert not _asuretify("No insurance clauses.", _coi(row)).triggered
+    assert not _asuretify(WAIVER_CONTRACT, ACORD_BOILERPLATE).triggered
+
+
+@pytest.mark.parametrize("text, value, decisive", [
+    ("EMR: 1.7", "1.7", True),
+    ("Experience Modification Rate (EMR): 1.62", "1.62", True),
+    ("Our EMR is 0.9 and our revenue grew 2.5 times", "0.9", False),
+    ("EMR 0.85 (2024), EMR 1.9 (2021)", "0.85", False),
+])
+def test_emr_uses_first_value_after_label(text, value, decisive):
+    result = RuleEngine().evaluate("riskguru", {"Document": text}, TODAY)
+    assert result.is_decisive is decisive
+    assert result.facts == [f"Current EMR stated in the document: {value}"]
+
+
+def test_emr_without_labelled_value_defers_to_model():
+    result = RuleEngine().evaluate("prequaligy", {"Document": "EMR history: 2024 0.8, 2022 1.8"}, TODAY)
+    assert not result.outcomes
+    assert result.annotate_prompt("PROMPT") == "PROMPT"
+
+
+def test_invalid_rule_definition():
+    with pytest.raises(RuleConfigError):
+        RuleEngine({"kinetic": [{"name": "bad", "type": "number", "pattern": "x", "condition": ">"}]})
@@ -0,0 +1,49 @@
+# tests/test_text_normalizer.py
+
+from text_normalizer import NormalizationStats, normalize_pages
+
+
+def test_repeated_header_kept_once_and_page_labels_removed():
+    pages = [f"ACME Corp Safety Manual\nSection {i} body text\nPage {i} of 3" for i in (1, 2, 3)]
+    result = normalize_pages(pages)
+    assert result.text.count("ACME Corp Safety Manual") == 1
+    assert "Page" not in result.text
+    assert all(f"Section {i} body text" in result.text for i in (1, 2, 3))
+    # Repeated header and "Page N of 3" footer on pages 2 and 3
+    assert result.removed_boilerplate == 4
+
+
+def test_edge_lines_with_different_figures_are_kept():
+    pages = [
+        f"Balance Sheet\nCash ${cash}\nTotal assets ${total}"
+        for cash, total in (("10,000", "11,111"), ("20,000", "99,999"), ("30,000", "55,555"))
+    ]
+    text = normalize_pages(pages).text
+    for total in ("11,111", "99,999", "55,555"):
+        assert f"Total assets ${total}" in text
+
+
+def test_bare_numbers_removed_only_as_page_sequence():
+    pages = [
+        "Limits\nEach occurrence\n2000\n5000\nAggregate\nmore text\n1",
+        "Limits\nProducts\n2000\n5000\nAggregate\nother text\n2",
+    ]
+    text = normalize_pages(pages).text
+    assert text.count("2000") == 2
+    assert text.count("5000") == 2
+    assert "\n1\n" not in f"\n{text}\n" and "\n2\n" not in f"\n{text}\n"
+
+
+def test_hyphenation_rules_and_whitespace():
+    result = normalize_pages(["The sub-\ncontractor   shall\n----------\n\n\n\ncomply"])
+    assert result.text == "The subcontractor shall\n\ncomply"
+    assert result.reduction > 0
+
+
+def test_stats_accumulate():
+    stats = NormalizationStats()
+    stats.record(normalize_pages(["Header\nbody\n----", "Header\nbody two\n----"]))
+    snapshot = stats.snapshot()
+    assert snapshot["documents"] == 1
+    assert snapshot["original_tokens"] > snapshot["normalized_tokens"]
+    assert 0 < snapshot["reduction"] < 1
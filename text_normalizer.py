@@ -0,0 +1,243 @@
+# text_normalizer.py
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+
+# Lines at the top/bottom of each page that are checked for repeated headers and footers
+EDGE_LINES = 3
+
+# Fraction of pages a header/footer line must appear on to be treated as boilerplate
+BOILERPLATE_RATIO = 0.6
+
+# Headers and footers are short; longer repeated lines are kept as content
+MAX_BOILERPLATE_CHARS = 100
+
+# "Page 3", "Page 3 of 12", "3 of 12" anywhere in a line
+_PAGE_REF_RE = re.compile(r"\b(?:(?:page|pg\.?|p\.)\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|\d{1,4}\s+of\s+\d{1,4})\b", re.IGNORECASE)
+# A line that is only a page reference
+_PAGE_LABEL_RE = re.compile(rf"^[\s\-–—|]*(?:{_PAGE_REF_RE.pattern})[\s\-–—|]*$", re.IGNORECASE)
+# A line that is only a bare number ("3", "- 3 -", "3/12"); a page number only if it counts up with the pages
+_BARE_NUMBER_RE = re.compile(r"^[\s\-–—|]*(\d{1,4})(?:\s*/\s*\d{1,4})?[\s\-–—|]*$")
+_HYPHEN_BREAK_RE = re.compile(r"([A-Za-z]{2,})-\n[ \t]*([a-z])")
+_RULE_RUN_RE = re.compile(r"[.\-_=~*•·]{4,}|[|¦]{2,}")
+_SPACES_RE = re.compile(r"[ \t ]+")
+_ALNUM_RE = re.compile(r"[A-Za-z0-9]")
+_WORD_RE = re.compile(r"[A-Za-z0-9$%]{2,}")
+
+
+class NormalizedText:
+    """
+    Result of normalizing OCR output, with the estimated prompt-token reduction.
+    """
+
+    def __init__(self, text: str, original_text: str, removed_boilerplate: int, removed_lines: int):
+        self.text = text
+        self.original_tokens = estimate_tokens(original_text)
+        self.normalized_tokens = estimate_tokens(text)
+        self.removed_boilerplate = removed_boilerplate
+        self.removed_lines = removed_lines
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of estimated tokens removed (0.0 – 1.0)."""
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.normalized_tokens / self.original_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.original_tokens:,} → {self.normalized_tokens:,} est. tokens "
+            f"(-{self.reduction:.1%}; {self.removed_boilerplate} boilerplate and "
+            f"{self.removed_lines} low-information lines removed)"
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the prompt token count of a text (~4 characters per token for English).
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def _boilerplate_key(line: str) -> str:
+    # Only page references are masked; lines whose other figures differ (totals, limits) are content
+    return _PAGE_REF_RE.sub("page #", _SPACES_RE.sub(" ", line).strip().lower())
+
+
+def _is_low_information(line: str) -> bool:
+    """Table rules, stray punctuation and OCR speckle that carry no content."""
+    stripped = line.strip()
+    if not stripped:
+        return False
+    if not _ALNUM_RE.search(stripped):
+        return True
+    alnum = len(_ALNUM_RE.findall(stripped))
+    non_space = len(stripped.replace(" ", ""))
+    return alnum / non_space < 0.3 and not _WORD_RE.search(stripped)
+
+
+def _clean_page(page: str) -> List[str]:
+    page = _HYPHEN_BREAK_RE.sub(r"\1\2", page)
+    lines = []
+    for line in page.splitlines():
+        line = _RULE_RUN_RE.sub(" ", line)
+        line = _SPACES_RE.sub(" ", line).strip()
+        lines.append(line)
+    return lines
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    """Indexes of the first and last EDGE_LINES non-empty lines of a page."""
+    content_idxs = [i for i, line in enumerate(lines) if line]
+    return sorted(set(content_idxs[:EDGE_LINES] + content_idxs[-EDGE_LINES:]))
+
+
+def _find_page_numbers(pages: List[List[str]]) -> Set[Tuple[int, int]]:
+    """
+    Returns (page, line) positions of page numbers in the header/footer zone.
+
+    "Page N" style labels always qualify; bare numbers only when they count up with the pages
+    (same page-number offset on at least two pages), so table figures like "2000" are kept.
+    """
+    positions = set()
+    bare_numbers: Dict[int, List[Tuple[int, int]]] = {}
+    for page_idx, lines in enumerate(pages):
+        for line_idx in _edge_indexes(lines):
+            line = lines[line_idx]
+            if _PAGE_LABEL_RE.match(line):
+                positions.add((page_idx, line_idx))
+                continue
+            bare = _BARE_NUMBER_RE.match(line)
+            if bare:
+                offset = int(bare.group(1)) - page_idx
+                bare_numbers.setdefault(offset, []).append((page_idx, line_idx))
+
+    for candidates in bare_numbers.values():
+        if len({page_idx for page_idx, _ in candidates}) >= 2:
+            positions.update(candidates)
+    return positions
+
+
+def _find_boilerplate(pages: List[List[str]]) -> set:
+    """Returns keys of lines repeated in the header/footer zone of most pages."""
+    if len(pages) < 2:
+        return set()
+
+    counts = Counter()
+    for lines in pages:
+        counts.update({_boilerplate_key(lines[idx]) for idx in _edge_indexes(lines)})
+
+    min_pages = max(2, math.ceil(BOILERPLATE_RATIO * len(pages)))
+    # Only short lines with real words qualify; repeated figures (limits, amounts) are content
+    return {
+        key for key, count in counts.items()
+        if count >= min_pages and len(key) <= MAX_BOILERPLATE_CHARS and re.search(r"[a-z]{3,}", key)
+    }
+
+
+def normalize_pages(pages: List[str]) -> NormalizedText:
+    """
+    Normalizes per-page OCR output before it is pasted into an agent prompt.
+
+    Removes headers/footers repeated across pages (keeping the first occurrence), page numbers
+    in the header/footer zone, table-rule and speckle lines, rejoins words hyphenated across line breaks and collapses
+    runs of whitespace and blank lines.
+
+    Args:
+        pages (List[str]): OCR text of each page, in order.
+
+    Returns:
+        NormalizedText: Normalized text and token-reduction statistics.
+    """
+    original = "\n\n".join(p.strip() for p in pages if p.strip())
+    cleaned = [_clean_page(page) for page in pages]
+    boilerplate = _find_boilerplate(cleaned)
+    page_numbers = _find_page_numbers(cleaned)
+
+    seen_boilerplate = set()
+    removed_boilerplate = 0
+    removed_lines = 0
+    output_pages = []
+
+    for page_idx, lines in enumerate(cleaned):
+        edge_idxs = set(_edge_indexes(lines))
+
+        kept = []
+        for idx, line in enumerate(lines):
+            if not line:
+                # Collapse runs of blank lines into one paragraph break
+                if kept and kept[-1]:
+                    kept.append("")
+                continue
+
+            key = _boilerplate_key(line)
+            if idx in edge_idxs and key in boilerplate:
+                if key in seen_boilerplate:
+                    removed_boilerplate += 1
+                    continue
+                seen_boilerplate.add(key)
+
+            if (page_idx, idx) in page_numbers or _is_low_information(line):
+                removed_lines += 1
+                continue
+
+            kept.append(line)
+
+        page_text = "\n".join(kept).strip()
+        if page_text:
+            output_pages.append(page_text)
+
+    return NormalizedText("\n\n".join(output_pages), original, removed_boilerplate, removed_lines)
+
+
+class NormalizationStats:
+    """Thread-safe running totals of the OCR text normalization, for reporting token savings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.original_tokens = 0
+        self.normalized_tokens = 0
+        self.removed_boilerplate = 0
+        self.removed_lines = 0
+
+    def record(self, normalized: NormalizedText) -> None:
+        with self._lock:
+            self.documents += 1
+            self.original_tokens += normalized.original_tokens
+            self.normalized_tokens += normalized.normalized_tokens
+            self.removed_boilerplate += normalized.removed_boilerplate
+            self.removed_lines += normalized.removed_lines
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            Dict: Document count, estimated tokens before/after and the overall reduction.
+        """
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "original_tokens": self.original_tokens,
+                "normalized_tokens": self.normalized_tokens,
+                "reduction": round(1 - self.normalized_tokens / self.original_tokens, 3) if self.original_tokens else 0.0,
+                "boilerplate_lines_removed": self.removed_boilerplate,
+                "low_information_lines_removed": self.removed_lines,
+            }
+
+
+_stats = NormalizationStats()
+
+
+def get_normalization_stats() -> NormalizationStats:
+    """Returns the process-wide normalization totals updated by `ocr_utils` after every OCR run."""
+    return _stats
@@ -1,6 +1,7 @@
 # wrappotal.py
 
 from ocr_utils import extract_images_from_pdf, run_ocr_on_images
+from rule_engine import get_rule_engine
 
 
 class WrappotalAgent:
@@ -9,6 +10,7 @@ class WrappotalAgent:
     """
     def __init__(self, gemini_model):
         self.model = gemini_model
+        self.document_texts = {}
 
     def run(self, file_bytes: bytes) -> str:
         """
@@ -31,16 +33,36 @@ class WrappotalAgent:
             if not extracted_text.strip():
                 return "No readable text was found in the document after OCR."
 
-            # Step 3: Create detailed analysis prompt
-            prompt = self._build_prompt(extracted_text)
-
-            # Step 4: Send prompt to Gemini model
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            # Step 3: Pre-screen and analyze the extracted text
+            return self.analyze(extracted_text)
 
         except Exception as e:
             return f"An error occurred while analyzing the Wrap-Up document: {str(e)}"
 
+    def analyze(self, extracted_text: str) -> str:
+        """
+        Evaluates already-extracted wrap-up document text for program compliance.
+
+        Args:
+            extracted_text (str): OCR-extracted document text.
+
+        Returns:
+            str: Analysis result with summary and wrap-up validation.
+        """
+        self.document_texts = {"Document": extracted_text}
+
+        # Step 1: Deterministic pre-screen; clear-cut cases skip the LLM call
+        screen = get_rule_engine().evaluate("wrappotal", self.document_texts)
+        if screen.is_decisive:
+            return screen.report()
+
+        # Step 2: Create detailed analysis prompt
+        prompt = screen.annotate_prompt(self._build_prompt(extracted_text))
+
+        # Step 3: Send prompt to Gemini model
+        response = self.model.generate_content(prompt)
+        return response.text.strip()
+
     def _build_prompt(self, extracted_text: str) -> str:
         """
         Constructs the AI prompt to analyze OCIP/CCIP documentation.